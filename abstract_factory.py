@@ -8,6 +8,22 @@
 
 
 import abc
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import heapq
+import itertools
+import os
+import queue
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, Iterator, List, Sequence
 
 
 # -------------------- INTERFACES ------------------------- #
@@ -17,10 +33,25 @@ class CloudStorage(abc.ABC):
     Declares methods:
         - get_file(),
         - put_file(),
-        - delete_file()
+        - delete_file(),
+        - iter_file(),
+        - read_range(),
+        - upload_file(),
+        - start_upload(), upload_part(), complete_upload(), abort_upload(),
+        - close()
+    Defaults of streaming methods buffer whole file: providers override
+    them to keep memory bounded.
     """
+    PART_SIZE = 8 << 20
+
+    def __init__(self):
+        # Parts of default (in-memory) multipart uploads, by upload id.
+        self._parts = {}
+
     @abc.abstractmethod
     def get_file(self, filename):
+        """File content, or None if there is no such file.
+        """
         pass
 
     @abc.abstractmethod
@@ -31,22 +62,139 @@ class CloudStorage(abc.ABC):
     def delete_file(self, filename):
         pass
 
+    def iter_file(self, filename, chunk_size: int = 1 << 20
+                  ) -> Iterator[bytes]:
+        """Download file by chunks. Missing file gives no chunks.
+        """
+        content = self.get_file(filename) or b''
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size]
+
+    def read_range(self, filename, start: int, length: int) -> bytes:
+        """Download "length" bytes of file from "start" position.
+        Missing file reads as empty.
+        """
+        content = self.get_file(filename) or b''
+        return content[start:start + length]
+
+    def upload_file(self, file_object, filename, part_size: int = None,
+                    concurrency: int = 4):
+        """Multipart upload from file object (or mmap): parts of part_size
+        bytes are uploaded in parallel. Not more than "concurrency" parts
+        are in memory at once.
+        """
+        part_size = part_size or self.PART_SIZE
+        upload_id = self.start_upload(filename)
+        numbers = []
+        try:
+            with concurrent.futures.ThreadPoolExecutor(concurrency) as pool:
+                running = set()
+                for number in itertools.count(1):
+                    part = file_object.read(part_size)
+                    if not part:
+                        break
+                    if len(running) >= concurrency:
+                        done, running = concurrent.futures.wait(
+                            running,
+                            return_when=concurrent.futures.FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    running.add(pool.submit(self.upload_part, upload_id,
+                                            number, part))
+                    numbers.append(number)
+                    del part
+                for future in concurrent.futures.as_completed(running):
+                    future.result()
+            self.complete_upload(upload_id, filename, numbers)
+        except BaseException:
+            self.abort_upload(upload_id)
+            raise
+
+    def start_upload(self, filename) -> str:
+        """Start multipart upload, get its id.
+        """
+        upload_id = uuid.uuid4().hex
+        self._parts[upload_id] = {}
+        return upload_id
+
+    def upload_part(self, upload_id: str, number: int, data: bytes):
+        self._parts[upload_id][number] = bytes(data)
+
+    def complete_upload(self, upload_id: str, filename, numbers: List[int]):
+        """Join parts (in "numbers" order) to file.
+        """
+        parts = self._parts.pop(upload_id)
+        self.put_file(b''.join(parts[q] for q in numbers), filename)
+
+    def abort_upload(self, upload_id: str):
+        self._parts.pop(upload_id, None)
+
+    def close(self):
+        pass
+
 
 class CloudDB(abc.ABC):
     """Abstract cloud DB.
     Declares methods:
         - exec_sql(),
+        - execute(),
+        - executemany(),
+        - iter_rows(),
+        - close()
     """
     @abc.abstractmethod
     def exec_sql(self, sql):
         pass
 
+    @abc.abstractmethod
+    def execute(self, sql, params: Sequence = ()) -> list:
+        """Parameterized query, returns all rows.
+        """
+        pass
+
+    def executemany(self, sql, params_list: Iterable[Sequence]):
+        """Run one statement for many parameters sets, in one batch.
+        Default: execute() for each set.
+        """
+        for params in params_list:
+            self.execute(sql, params)
+
+    def iter_rows(self, sql, params: Sequence = (),
+                  batch_size: int = 1000) -> Iterator[tuple]:
+        """Streaming cursor: rows are fetched by batches.
+        Default fetches all rows at once.
+        """
+        return iter(self.execute(sql, params) or ())
+
+    def close(self):
+        pass
+
+
+class Message:
+    """Received queue message. Must be acknowledged (by ack()) before
+    "deadline" (time.monotonic() value), or it is delivered again.
+    "receipt" identifies this delivery: ack() of old delivery does not
+    delete message, delivered again.
+    """
+    __slots__ = ('id', 'body', 'deadline', 'receipt')
+
+    def __init__(self, id_, body, deadline: float = None, receipt=None):
+        self.id = id_
+        self.body = body
+        self.deadline = deadline
+        self.receipt = receipt
+
 
 class CloudQueue(abc.ABC):
     """Abstract computing Queue.
     Declares methods:
         - get_message(),
         - put_message(),
+        - receive_messages(),
+        - put_messages(),
+        - ack(),
+        - release(),
+        - close()
     """
     @abc.abstractmethod
     def get_message(self):
@@ -56,13 +204,50 @@ class CloudQueue(abc.ABC):
     def put_message(self, message):
         pass
 
+    def receive_messages(self, max_count: int = 10,
+                         visibility_timeout: float = 30) -> List[Message]:
+        """Receive up to max_count messages in one call. They are hidden
+        for visibility_timeout seconds, until ack().
+        Default: get_message() calls, messages are acknowledged at once.
+        """
+        messages = []
+        while len(messages) < max_count:
+            body = self.get_message()
+            if body is None:
+                break
+            messages.append(Message(None, body))
+        return messages
+
+    def put_messages(self, messages: Iterable):
+        """Put many messages in one call.
+        Default: put_message() calls.
+        """
+        for message in messages:
+            self.put_message(message)
+
+    def ack(self, message: Message):
+        """Message is processed: delete it from queue.
+        """
+        pass
+
+    def release(self, messages: Iterable[Message]):
+        """Messages are received, but won't be processed: make them
+        visible again at once.
+        Default: nothing, they are delivered again after timeout.
+        """
+        pass
+
+    def close(self):
+        pass
+
 
 class CloudServicesFactory(abc.ABC):
     """Abstract computing cloud interface class.
     Declares methods:
         - get_storage(),
         - get_db_connection(),
-        - get_message_queue()
+        - get_message_queue(),
+        - release()
     """
     @abc.abstractmethod
     def get_storage(self, name) -> CloudStorage:
@@ -76,6 +261,11 @@ class CloudServicesFactory(abc.ABC):
     def get_message_queue(self, name) -> CloudQueue:
         pass
 
+    def release(self, client):
+        """Client, got from factory, is not needed any more.
+        """
+        client.close()
+
 
 # -------------------- AWS FACTORY ------------------------- #
 
@@ -91,6 +281,28 @@ class AmazonS3(CloudStorage):
     def delete_file(self, filename):
         print('Deleted file from Amazon S3')
 
+    def iter_file(self, filename, chunk_size: int = 1 << 20
+                  ) -> Iterator[bytes]:
+        print('Streamed file from Amazon S3')
+        return iter(())
+
+    def read_range(self, filename, start: int, length: int) -> bytes:
+        print('Got range of file from Amazon S3')
+        return b''
+
+    def start_upload(self, filename) -> str:
+        print('Created multipart upload in Amazon S3')
+        return uuid.uuid4().hex
+
+    def upload_part(self, upload_id: str, number: int, data: bytes):
+        print('Uploaded part to Amazon S3')
+
+    def complete_upload(self, upload_id: str, filename, numbers: List[int]):
+        print('Completed multipart upload in Amazon S3')
+
+    def abort_upload(self, upload_id: str):
+        print('Aborted multipart upload in Amazon S3')
+
 
 class AmazonRDS(CloudDB):
     """AWS / DB
@@ -98,6 +310,18 @@ class AmazonRDS(CloudDB):
     def exec_sql(self, sql):
         print('Executed SQL in Amazon RDS')
 
+    def execute(self, sql, params: Sequence = ()) -> list:
+        print('Executed prepared SQL in Amazon RDS')
+        return []
+
+    def executemany(self, sql, params_list: Iterable[Sequence]):
+        print('Executed SQL batch in Amazon RDS')
+
+    def iter_rows(self, sql, params: Sequence = (),
+                  batch_size: int = 1000) -> Iterator[tuple]:
+        print('Opened server-side cursor in Amazon RDS')
+        return iter(())
+
 
 class AmazonSQS(CloudQueue):
     """AWS / Queue
@@ -108,6 +332,20 @@ class AmazonSQS(CloudQueue):
     def put_message(self, message):
         print('Put message to Amazon SQS')
 
+    def receive_messages(self, max_count: int = 10,
+                         visibility_timeout: float = 30) -> List[Message]:
+        print('Check up to %d messages in Amazon SQS' % max_count)
+        return []
+
+    def put_messages(self, messages: Iterable):
+        print('Put %d messages to Amazon SQS' % len(list(messages)))
+
+    def ack(self, message: Message):
+        print('Delete message from Amazon SQS')
+
+    def release(self, messages: Iterable[Message]):
+        print('Make %d messages visible in Amazon SQS' % len(list(messages)))
+
 
 class AmazonWebServicesFactory(CloudServicesFactory):
     """AWS - Factory
@@ -136,6 +374,28 @@ class GCStorage(CloudStorage):
     def delete_file(self, filename):
         print('Deleted file from Google Cloud Storage')
 
+    def iter_file(self, filename, chunk_size: int = 1 << 20
+                  ) -> Iterator[bytes]:
+        print('Streamed file from Google Cloud Storage')
+        return iter(())
+
+    def read_range(self, filename, start: int, length: int) -> bytes:
+        print('Got range of file from Google Cloud Storage')
+        return b''
+
+    def start_upload(self, filename) -> str:
+        print('Started resumable upload to Google Cloud Storage')
+        return uuid.uuid4().hex
+
+    def upload_part(self, upload_id: str, number: int, data: bytes):
+        print('Uploaded chunk to Google Cloud Storage')
+
+    def complete_upload(self, upload_id: str, filename, numbers: List[int]):
+        print('Composed upload in Google Cloud Storage')
+
+    def abort_upload(self, upload_id: str):
+        print('Cancelled upload to Google Cloud Storage')
+
 
 class GCSQL(CloudDB):
     """GC / DB
@@ -143,6 +403,18 @@ class GCSQL(CloudDB):
     def exec_sql(self, sql):
         print('Executed SQL in Google Cloud SQL')
 
+    def execute(self, sql, params: Sequence = ()) -> list:
+        print('Executed prepared SQL in Google Cloud SQL')
+        return []
+
+    def executemany(self, sql, params_list: Iterable[Sequence]):
+        print('Executed SQL batch in Google Cloud SQL')
+
+    def iter_rows(self, sql, params: Sequence = (),
+                  batch_size: int = 1000) -> Iterator[tuple]:
+        print('Opened server-side cursor in Google Cloud SQL')
+        return iter(())
+
 
 class GCPubSub(CloudQueue):
     """GC / Queue
@@ -153,6 +425,22 @@ class GCPubSub(CloudQueue):
     def put_message(self, message):
         print('Put message to Google Cloud PubSub')
 
+    def receive_messages(self, max_count: int = 10,
+                         visibility_timeout: float = 30) -> List[Message]:
+        print('Pull up to %d messages from Google Cloud PubSub' % max_count)
+        return []
+
+    def put_messages(self, messages: Iterable):
+        print('Publish %d messages to Google Cloud PubSub' %
+              len(list(messages)))
+
+    def ack(self, message: Message):
+        print('Acknowledge message in Google Cloud PubSub')
+
+    def release(self, messages: Iterable[Message]):
+        print('Nack %d messages in Google Cloud PubSub' %
+              len(list(messages)))
+
 
 class GoogleCloudFactory(CloudServicesFactory):
     """GC - Factory
@@ -167,23 +455,760 @@ class GoogleCloudFactory(CloudServicesFactory):
         return GCPubSub()
 
 
+# -------------------- LOCAL FACTORY ------------------------- #
+
+class InjectedError(Exception):
+    """Failure of local stand-in, made by FaultInjector.
+    """
+    pass
+
+
+class FaultInjector:
+    """Makes local stand-ins look remote: every call waits
+    latency +- jitter seconds and fails with error_rate probability.
+    """
+    def __init__(self, latency: float = 0, jitter: float = 0,
+                 error_rate: float = 0, seed: int = None):
+        self._latency = latency
+        self._jitter = jitter
+        self._error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, operation: str):
+        with self._lock:
+            delay = self._latency + self._random.uniform(-self._jitter,
+                                                         self._jitter)
+            failed = self._random.random() < self._error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            raise InjectedError('Injected "%s" failure.' % operation)
+
+
+class LocalStorage(CloudStorage):
+    """Local / Storage: files in directory.
+    Multipart upload parts are kept in files, until complete_upload().
+    """
+    def __init__(self, root: str, inject: FaultInjector):
+        super().__init__()
+        self._root = root
+        self._uploads_root = root + '.uploads'
+        self._inject = inject
+        os.makedirs(root, exist_ok=True)
+
+    def get_file(self, filename):
+        self._inject('get_file')
+        try:
+            with open(self._path(filename), 'rb') as file_:
+                return file_.read()
+        except FileNotFoundError:
+            return None
+
+    def put_file(self, file_, filename):
+        self._inject('put_file')
+        if isinstance(file_, str):
+            file_ = file_.encode()
+        temp_path = self._path(filename) + '.tmp%d' % threading.get_ident()
+        with open(temp_path, 'wb') as output:
+            output.write(file_)
+        os.replace(temp_path, self._path(filename))
+
+    def delete_file(self, filename):
+        self._inject('delete_file')
+        try:
+            os.remove(self._path(filename))
+        except FileNotFoundError:
+            pass
+
+    def iter_file(self, filename, chunk_size: int = 1 << 20
+                  ) -> Iterator[bytes]:
+        self._inject('iter_file')
+        try:
+            file_ = open(self._path(filename), 'rb')
+        except FileNotFoundError:
+            return
+        with file_:
+            while True:
+                chunk = file_.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def read_range(self, filename, start: int, length: int) -> bytes:
+        self._inject('read_range')
+        try:
+            file_ = open(self._path(filename), 'rb')
+        except FileNotFoundError:
+            return b''
+        with file_:
+            file_.seek(start)
+            return file_.read(length)
+
+    def start_upload(self, filename) -> str:
+        self._inject('start_upload')
+        upload_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(self._uploads_root, upload_id))
+        return upload_id
+
+    def upload_part(self, upload_id: str, number: int, data: bytes):
+        self._inject('upload_part')
+        with open(self._part_path(upload_id, number), 'wb') as output:
+            output.write(data)
+
+    def complete_upload(self, upload_id: str, filename, numbers: List[int]):
+        self._inject('complete_upload')
+        temp_path = self._path(filename) + '.tmp%d' % threading.get_ident()
+        with open(temp_path, 'wb') as output:
+            for number in numbers:
+                with open(self._part_path(upload_id, number), 'rb') as part:
+                    shutil.copyfileobj(part, output)
+        os.replace(temp_path, self._path(filename))
+        shutil.rmtree(os.path.join(self._uploads_root, upload_id))
+
+    def abort_upload(self, upload_id: str):
+        shutil.rmtree(os.path.join(self._uploads_root, upload_id),
+                      ignore_errors=True)
+
+    def _part_path(self, upload_id: str, number: int) -> str:
+        return os.path.join(self._uploads_root, upload_id, '%06d' % number)
+
+    def _path(self, filename) -> str:
+        if os.path.basename(filename) != filename or filename in ('.', '..'):
+            raise ValueError('Invalid file name "%s".' % filename)
+        return os.path.join(self._root, filename)
+
+
+class SQLitePool:
+    """Bounded pool of connections to sqlite database file.
+    Every connection keeps LRU cache of prepared statements
+    (statement_cache_size statements, sqlite3 "cached_statements").
+    """
+    def __init__(self, path: str, max_size: int = 4,
+                 statement_cache_size: int = 128, timeout: float = 5):
+        self._path = path
+        self._statement_cache_size = statement_cache_size
+        self._timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Borrowed connection, for "with" statement.
+        """
+        if not self._slots.acquire(timeout=self._timeout):
+            raise TimeoutError('No free connections to "%s".' % self._path)
+        try:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._connect()
+            try:
+                yield connection
+            except BaseException:
+                # Error of caller's SQL (or GeneratorExit of abandoned
+                # iter_rows()) does not break connection: roll back and
+                # reuse it, with its statement cache.
+                try:
+                    if connection.in_transaction:
+                        connection.execute('ROLLBACK')
+                except sqlite3.Error:
+                    connection.close()
+                else:
+                    self._release(connection)
+                raise
+            self._release(connection)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _release(self, connection: sqlite3.Connection):
+        if self._closed:
+            connection.close()
+        else:
+            self._idle.put(connection)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self._path, timeout=self._timeout, check_same_thread=False,
+            isolation_level=None,
+            cached_statements=self._statement_cache_size)
+        connection.execute('PRAGMA journal_mode=WAL')
+        return connection
+
+
+class LocalDB(CloudDB):
+    """Local / DB: sqlite database file.
+    Connections are borrowed for every call from pool, shared by
+    all LocalDB objects of the same name.
+    """
+    def __init__(self, pool: SQLitePool, inject: FaultInjector):
+        self._pool = pool
+        self._inject = inject
+
+    def exec_sql(self, sql):
+        return self.execute(sql)
+
+    def execute(self, sql, params: Sequence = ()) -> list:
+        self._inject('execute')
+        with self._pool.connection() as connection:
+            return connection.execute(sql, params).fetchall()
+
+    def executemany(self, sql, params_list: Iterable[Sequence]):
+        """All parameters sets in one transaction.
+        """
+        self._inject('executemany')
+        with self._pool.connection() as connection:
+            connection.execute('BEGIN')
+            try:
+                connection.executemany(sql, params_list)
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+
+    def iter_rows(self, sql, params: Sequence = (),
+                  batch_size: int = 1000) -> Iterator[tuple]:
+        """Connection is held until iteration ends (or iterator closed).
+        """
+        self._inject('iter_rows')
+        with self._pool.connection() as connection:
+            cursor = connection.execute(sql, params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        return
+                    yield from rows
+            finally:
+                cursor.close()
+
+
+class LocalQueue(CloudQueue):
+    """Local / Queue: in-memory messages deque.
+    get_message() returns None, if queue is empty.
+    Received, but not acknowledged in time messages are delivered again.
+    """
+    def __init__(self, inject: FaultInjector):
+        self._inject = inject
+        self._messages = collections.deque()
+        self._in_flight = {}
+        self._deadlines = []
+        self._ids = itertools.count(1)
+        self._receipts = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def get_message(self):
+        messages = self.receive_messages(1)
+        if not messages:
+            return None
+        self.ack(messages[0])
+        return messages[0].body
+
+    def put_message(self, message):
+        self.put_messages([message])
+
+    def receive_messages(self, max_count: int = 10,
+                         visibility_timeout: float = 30) -> List[Message]:
+        self._inject('receive_messages')
+        now = time.monotonic()
+        result = []
+        with self._lock:
+            self._return_expired(now)
+            while self._messages and len(result) < max_count:
+                id_, body = self._messages.popleft()
+                message = Message(id_, body, now + visibility_timeout,
+                                  next(self._receipts))
+                self._in_flight[message.receipt] = message
+                heapq.heappush(self._deadlines,
+                               (message.deadline, message.receipt))
+                result.append(message)
+        return result
+
+    def put_messages(self, messages: Iterable):
+        self._inject('put_messages')
+        with self._lock:
+            self._messages.extend((next(self._ids), q) for q in messages)
+
+    def ack(self, message: Message):
+        self._inject('ack')
+        with self._lock:
+            self._in_flight.pop(message.receipt, None)
+
+    def release(self, messages: Iterable[Message]):
+        """Return messages to queue head, in the same order.
+        """
+        with self._lock:
+            released = [self._in_flight.pop(q.receipt, None)
+                        for q in messages]
+            for message in reversed(released):
+                if message is not None:
+                    self._messages.appendleft((message.id, message.body))
+
+    def _return_expired(self, now: float):
+        """Return not acknowledged in time messages to queue head.
+        Deadlines heap: only expired entries are looked at (entries of
+        acknowledged messages are just skipped). Lock must be held.
+        """
+        expired = []
+        while self._deadlines and self._deadlines[0][0] <= now:
+            message = self._in_flight.pop(
+                heapq.heappop(self._deadlines)[1], None)
+            if message is not None:
+                expired.append(message)
+        for message in reversed(expired):
+            self._messages.appendleft((message.id, message.body))
+
+
+class LocalServicesFactory(CloudServicesFactory):
+    """Local - Factory. In-process stand-ins of cloud services, for tests
+    and benchmarks. Storage and DB live in "root" directory (temporary
+    one by default), queues and DB connection pools of the same name
+    are shared.
+    """
+    def __init__(self, root: str = None, latency: float = 0,
+                 jitter: float = 0, error_rate: float = 0, seed: int = None,
+                 db_pool_size: int = 4, statement_cache_size: int = 128):
+        # Temporary root is created here, so close() removes it.
+        self._temporary = root is None
+        self._root = root or tempfile.mkdtemp(prefix='local_cloud_')
+        self._inject = FaultInjector(latency, jitter, error_rate, seed)
+        self._db_pool_size = db_pool_size
+        self._statement_cache_size = statement_cache_size
+        self._queues = {}
+        self._db_pools = {}
+        self._lock = threading.Lock()
+
+    def get_storage(self, name) -> LocalStorage:
+        return LocalStorage(os.path.join(self._root, 'storage', name),
+                            self._inject)
+
+    def get_db_connection(self, name) -> LocalDB:
+        with self._lock:
+            if name not in self._db_pools:
+                self._db_pools[name] = SQLitePool(
+                    os.path.join(self._root, name + '.sqlite'),
+                    self._db_pool_size, self._statement_cache_size)
+            return LocalDB(self._db_pools[name], self._inject)
+
+    def get_message_queue(self, name) -> LocalQueue:
+        with self._lock:
+            if name not in self._queues:
+                self._queues[name] = LocalQueue(self._inject)
+            return self._queues[name]
+
+    def close(self):
+        """Close DB connection pools, remove temporary root directory.
+        """
+        with self._lock:
+            for pool in self._db_pools.values():
+                pool.close()
+            if self._temporary:
+                shutil.rmtree(self._root, ignore_errors=True)
+
+
+# -------------------- QUEUE CONSUMER ------------------------- #
+
+class PrefetchingConsumer:
+    """Queue consumer with local buffer, topped up by background thread
+    with receive_messages() batches (up to "prefetch" messages).
+    Messages, whose visibility deadline passed in buffer, are skipped:
+    queue delivers them again. Not consumed messages are released back
+    to queue on close().
+    """
+    def __init__(self, queue: CloudQueue, prefetch: int = 100,
+                 batch_size: int = 10, visibility_timeout: float = 30,
+                 poll_interval: float = 0.1):
+        self._queue = queue
+        self._prefetch = prefetch
+        self._batch_size = batch_size
+        self._visibility_timeout = visibility_timeout
+        self._poll_interval = poll_interval
+        self._buffer = collections.deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self.errors = 0
+        self._fetcher = threading.Thread(target=self._fetch, daemon=True)
+        self._fetcher.start()
+
+    def get(self, timeout: float = None) -> Message:
+        """Next message, or None if there is none during timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                while self._buffer:
+                    message = self._buffer.popleft()
+                    self._condition.notify_all()
+                    if (message.deadline is None or
+                            message.deadline > time.monotonic()):
+                        return message
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                if self._closed:
+                    return None
+                self._condition.wait(remaining)
+
+    def ack(self, message: Message):
+        self._queue.ack(message)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._fetcher.join()
+        with self._condition:
+            buffered = list(self._buffer)
+            self._buffer.clear()
+        if buffered:
+            self._queue.release(buffered)
+
+    def _fetch(self):
+        while True:
+            with self._condition:
+                while (not self._closed and
+                       len(self._buffer) >= self._prefetch):
+                    self._condition.wait()
+                if self._closed:
+                    return
+                count = min(self._batch_size,
+                            self._prefetch - len(self._buffer))
+            try:
+                messages = self._queue.receive_messages(
+                    count, self._visibility_timeout)
+            except Exception:
+                self.errors += 1
+                messages = []
+            if messages:
+                with self._condition:
+                    self._buffer.extend(messages)
+                    self._condition.notify_all()
+            else:
+                with self._condition:
+                    if not self._closed:
+                        self._condition.wait(self._poll_interval)
+
+
+# -------------------- CACHING FACTORY ------------------------- #
+
+class _ClientEntry:
+    """Shared client with references count.
+    """
+    __slots__ = ('client', 'references', 'idle_since', 'pinned', 'ready',
+                 'error')
+
+    def __init__(self, client=None, pinned: bool = False):
+        self.client = client
+        self.references = 0
+        self.idle_since = time.monotonic()
+        self.pinned = pinned
+        self.ready = threading.Event()
+        self.error = None
+
+
+class CachingServicesFactory(CloudServicesFactory):
+    """Wrapper of any cloud factory: one shared client per (kind, name).
+    Clients are counted by get_*() / release() calls; clients without
+    references are closed after idle_timeout seconds (by background
+    thread). Names from "prewarm" ({'storage': [names], 'db': [...],
+    'queue': [...]}) are created at once and kept open until close().
+    Clients of providers must be thread-safe (like real SDK clients).
+    """
+    class NotAcquiredError(ValueError):
+        pass
+
+    def __init__(self, factory: CloudServicesFactory,
+                 idle_timeout: float = 300,
+                 prewarm: Dict[str, Iterable[str]] = None):
+        self._factory = factory
+        self._idle_timeout = idle_timeout
+        self._creators = {'storage': factory.get_storage,
+                          'db': factory.get_db_connection,
+                          'queue': factory.get_message_queue}
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._keys = {}
+        self._closed = threading.Event()
+        for kind, names in (prewarm or {}).items():
+            for name in names:
+                self._entry(kind, name, 0).pinned = True
+        self._reaper = threading.Thread(target=self._reap, daemon=True)
+        self._reaper.start()
+
+    def get_storage(self, name) -> CloudStorage:
+        return self._acquire('storage', name)
+
+    def get_db_connection(self, name) -> CloudDB:
+        return self._acquire('db', name)
+
+    def get_message_queue(self, name) -> CloudQueue:
+        return self._acquire('queue', name)
+
+    def release(self, client):
+        """Drop one reference to client. After close() it does nothing:
+        all clients are closed already.
+        """
+        with self._lock:
+            if self._closed.is_set():
+                return
+            entry = self._entries.get(self._keys.get(id(client)))
+            if (entry is None or entry.client is not client or
+                    entry.references <= 0):
+                raise self.NotAcquiredError(
+                    'Client %r is not acquired from this factory.' % client)
+            entry.references -= 1
+            if not entry.references:
+                entry.idle_since = time.monotonic()
+
+    def references(self, kind: str, name) -> int:
+        """References count of client (0 if there is no such client).
+        """
+        with self._lock:
+            entry = self._entries.get((kind, name))
+            return entry.references if entry else 0
+
+    def collect(self):
+        """Close clients, that are idle longer than idle_timeout.
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items()
+                       if entry.client is not None and
+                       not entry.references and not entry.pinned and
+                       now - entry.idle_since >= self._idle_timeout]
+            clients = [self._pop(key) for key in expired]
+        for client in clients:
+            client.close()
+
+    def close(self):
+        """Close all clients, stop background thread.
+        """
+        with self._lock:
+            self._closed.set()
+            # Clients, that are being created, are closed by creators.
+            clients = [self._pop(key) for key, entry in
+                       list(self._entries.items()) if entry.client is not None]
+        for client in clients:
+            client.close()
+
+    def _acquire(self, kind: str, name):
+        return self._entry(kind, name).client
+
+    def _entry(self, kind: str, name, references: int = 1) -> _ClientEntry:
+        """Get entry (adding "references" to it) or create client for it.
+        Client is created outside of the lock: other clients are not
+        blocked, concurrent callers of the same client wait for it.
+        """
+        key = (kind, name)
+        with self._lock:
+            entry = self._entries.get(key)
+            creating = entry is None
+            if creating:
+                entry = self._entries[key] = _ClientEntry()
+            entry.references += references
+        if not creating:
+            entry.ready.wait()
+            if entry.error is not None:
+                raise entry.error
+            return entry
+        try:
+            client = self._creators[kind](name)
+        except BaseException as error:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            entry.error = error
+            entry.ready.set()
+            raise
+        with self._lock:
+            closed = self._closed.is_set()
+            if closed:
+                self._entries.pop(key, None)
+                entry.error = RuntimeError('Factory is closed.')
+            else:
+                entry.client = client
+                self._keys[id(client)] = key
+        entry.ready.set()
+        if closed:
+            client.close()
+            raise entry.error
+        return entry
+
+    def _pop(self, key):
+        entry = self._entries.pop(key)
+        del self._keys[id(entry.client)]
+        return entry.client
+
+    def _reap(self):
+        while not self._closed.wait(min(self._idle_timeout / 2, 60)):
+            self.collect()
+
+
+# -------------------- WORKFLOW ------------------------- #
+
+class Step:
+    """Workflow step: name, function without arguments and names
+    of steps, that must be finished before it.
+    """
+    __slots__ = ('name', 'func', 'requires')
+
+    def __init__(self, name: str, func, requires: Iterable[str] = ()):
+        self.name = name
+        self.func = func
+        self.requires = tuple(requires)
+
+
+class Workflow:
+    """Steps with dependencies. Independent steps run concurrently,
+    on thread pool executor or on asyncio loop (in threads).
+    run*() return timings: {step name: (start, duration)}, seconds
+    from workflow start.
+    """
+    def __init__(self, steps: Iterable[Step]):
+        self._steps = {}
+        for step in steps:
+            self._steps[step.name] = step
+        self._order = self._sort()
+
+    def run(self, executor: concurrent.futures.Executor = None
+            ) -> Dict[str, tuple]:
+        """Run steps on executor (one by one, if there is no executor).
+        """
+        started = time.perf_counter()
+        timings = {}
+        if executor is None:
+            for step in self._order:
+                self._timed(step, started, timings)
+            return timings
+        waiting = {name: len(step.requires)
+                   for name, step in self._steps.items()}
+        running = {}
+
+        def submit(step):
+            future = executor.submit(self._timed, step, started, timings)
+            running[future] = step
+
+        for step in self._order:
+            if not step.requires:
+                submit(step)
+        while running:
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                if future.exception() is not None:
+                    for pending in running:
+                        pending.cancel()
+                    raise future.exception()
+                for dependent in self._dependents(step.name):
+                    waiting[dependent.name] -= 1
+                    if not waiting[dependent.name]:
+                        submit(dependent)
+        return timings
+
+    async def run_async(self) -> Dict[str, tuple]:
+        """Run steps in default executor of running loop.
+        """
+        started = time.perf_counter()
+        timings = {}
+        loop = asyncio.get_running_loop()
+        tasks = {}
+
+        async def run_step(step):
+            await asyncio.gather(*[tasks[q] for q in step.requires])
+            await loop.run_in_executor(None, self._timed, step, started,
+                                       timings)
+
+        for step in self._order:
+            tasks[step.name] = asyncio.ensure_future(run_step(step))
+        await asyncio.gather(*tasks.values())
+        return timings
+
+    def _timed(self, step: Step, started: float, timings: dict):
+        step_started = time.perf_counter()
+        step.func()
+        timings[step.name] = (step_started - started,
+                              time.perf_counter() - step_started)
+
+    def _dependents(self, name: str):
+        return [step for step in self._order if name in step.requires]
+
+    def _sort(self):
+        """Steps in dependencies order. Checks unknown steps and cycles.
+        """
+        order = []
+        state = {}
+
+        def visit(step, path):
+            if state.get(step.name) == 'done':
+                return
+            if state.get(step.name) == 'visiting':
+                raise ValueError('Steps cycle: %s.' % ' -> '.join(path))
+            state[step.name] = 'visiting'
+            for name in step.requires:
+                if name not in self._steps:
+                    raise ValueError('Unknown step "%s".' % name)
+                visit(self._steps[name], path + [name])
+            state[step.name] = 'done'
+            order.append(step)
+
+        for step in self._steps.values():
+            visit(step, [step.name])
+        return order
+
+
 # -------------------- APPLICATION ------------------------- #
 
 class Application:
     """Pattern's client class.
+    Steps of proceed() run concurrently, if executor is given.
     """
-    def __init__(self, cloud_services: CloudServicesFactory):
+    def __init__(self, cloud_services: CloudServicesFactory,
+                 executor: concurrent.futures.Executor = None):
+        self._cloud_services = cloud_services
+        self._executor = executor
         self._storage = cloud_services.get_storage('storage_name')
         self._db = cloud_services.get_db_connection('db_name')
         self._queue = cloud_services.get_message_queue('queue_name')
+        self._workflow = Workflow(self.steps())
+
+    def steps(self) -> Iterable[Step]:
+        return [
+            Step('get_message', self._queue.get_message),
+            Step('get_file', lambda: self._storage.get_file('name')),
+            Step('delete_file', lambda: self._storage.delete_file('name'),
+                 requires=['get_file']),
+            Step('exec_sql', lambda: self._db.exec_sql('SELECT 1'),
+                 requires=['get_message', 'get_file']),
+            Step('put_file',
+                 lambda: self._storage.put_file(b'content', 'name'),
+                 requires=['delete_file', 'exec_sql']),
+            Step('put_message', lambda: self._queue.put_message('msg'),
+                 requires=['exec_sql']),
+        ]
+
+    def proceed(self) -> Dict[str, tuple]:
+        """Run workflow, return steps timings.
+        """
+        return self._workflow.run(self._executor)
+
+    async def proceed_async(self) -> Dict[str, tuple]:
+        return await self._workflow.run_async()
 
-    def proceed(self):
-        self._queue.get_message()
-        self._storage.get_file('name')
-        self._storage.delete_file('name')
-        self._db.exec_sql('sql')
-        self._storage.put_file(b'content', 'name')
-        self._queue.put_message('msg')
+    def close(self):
+        for client in (self._storage, self._db, self._queue):
+            self._cloud_services.release(client)
 
 
 if __name__ == '__main__':
@@ -195,5 +1220,49 @@ if __name__ == '__main__':
     gc = GoogleCloudFactory()
     test_app_2 = Application(gc)
     test_app_2.proceed()
+    print('\n~ Local ~\n')
+    local = LocalServicesFactory(latency=0.001)
+    test_app_3 = Application(local)
+    print('Steps:', ', '.join(test_app_3.proceed()))
+    test_app_3.close()
+    jobs = local.get_message_queue('jobs')
+    jobs.put_messages(['job_%d' % q for q in range(5)])
+    consumer = PrefetchingConsumer(jobs, prefetch=3, batch_size=2)
+    for _ in range(5):
+        message = consumer.get(timeout=1)
+        consumer.ack(message)
+        print('Consumed:', message.body)
+    consumer.close()
+    db = local.get_db_connection('db_name')
+    db.execute('CREATE TABLE IF NOT EXISTS jobs (id INTEGER, name TEXT)')
+    db.executemany('INSERT INTO jobs VALUES (?, ?)',
+                   ((q, 'job_%d' % q) for q in range(1000)))
+    print('Rows:', sum(1 for _ in db.iter_rows(
+          'SELECT * FROM jobs WHERE id >= ?', (500,), batch_size=100)))
+    storage = local.get_storage('files')
+    with tempfile.TemporaryFile() as source:
+        source.write(bytes(range(256)) * 1000)
+        source.seek(0)
+        storage.upload_file(source, 'big.bin', part_size=64 << 10)
+    print('Uploaded: %d bytes, range: %r' % (
+          sum(len(q) for q in storage.iter_file('big.bin', 100000)),
+          storage.read_range('big.bin', 254, 4)))
+    local.close()
+    print('\n~ GC, concurrent steps ~\n')
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        timings = Application(gc, executor).proceed()
+    print('Steps:', ', '.join(timings))
+    print('\n~ Caching AWS ~\n')
+    caching = CachingServicesFactory(aws, idle_timeout=0.1,
+                                     prewarm={'queue': ['queue_name']})
+    apps = [Application(caching) for _ in range(3)]
+    print('Storage references:', caching.references('storage',
+                                                    'storage_name'))
+    for app in apps:
+        app.close()
+    time.sleep(0.2)
+    print('Storage references:', caching.references('storage',
+                                                    'storage_name'))
+    caching.close()
 
 
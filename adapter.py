@@ -9,8 +9,16 @@
 
 
 import abc
+import array
+import codecs
+import collections.abc
+import itertools
 import json
-from typing import List
+import math
+import re
+import struct
+import sys
+from typing import IO, Iterable, Iterator, List, Union
 
 
 # -------------------- INTERFACE ------------------------- #
@@ -31,6 +39,43 @@ class Serializer(abc.ABC):
         """
         pass
 
+    def dump(self, data, stream: IO[str]):
+        """Serialize something to writable text stream.
+        Default builds whole string first.
+        """
+        stream.write(self.serialize(data))
+
+    def load(self, source: Union[IO, Iterable]):
+        """Deserialize something from readable stream (text or binary)
+        or from iterator of chunks (str or bytes).
+        """
+        return self.deserialize(''.join(read_chunks(source)))
+
+    def iter_load(self, source: Union[IO, Iterable]) -> Iterator:
+        """Deserialize top-level list lazily, element by element.
+        Default loads whole list first.
+        """
+        return iter(self.load(source))
+
+
+def read_chunks(source: Union[IO, Iterable],
+                chunk_size: int = 1 << 16) -> Iterator[str]:
+    """Text chunks of stream or chunks iterator. Bytes are decoded
+    as UTF-8 incrementally (multibyte chars may be split by chunks).
+    """
+    if hasattr(source, 'read'):
+        stream = source
+        source = iter(lambda: stream.read(chunk_size), stream.read(0))
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in source:
+        if not isinstance(chunk, str):
+            chunk = decoder.decode(chunk)
+        if chunk:
+            yield chunk
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
 
 # -------------------- BASIC IMPLEMENTATION ------------------------- #
 
@@ -62,17 +107,494 @@ class StringsListSerializer(Serializer):
     def deserialize(self, data: str) -> List[str]:
         return data.split(self.SEPARATOR)
 
+    def dump(self, strings_list: List[str], stream: IO[str]):
+        for index, string in enumerate(strings_list):
+            if index:
+                stream.write(self.SEPARATOR)
+            stream.write(string)
+
+    def load(self, source: Union[IO, Iterable]) -> List[str]:
+        return list(self.iter_load(source))
+
+    def iter_load(self, source: Union[IO, Iterable]) -> Iterator[str]:
+        """Separator is searched in new chunk only (plus held back end
+        of previous one), pieces of current string are kept in a list.
+        """
+        keep = len(self.SEPARATOR) - 1
+        pending = []
+        head = ''
+        for chunk in read_chunks(source):
+            parts = (head + chunk).split(self.SEPARATOR)
+            if len(parts) > 1:
+                pending.append(parts[0])
+                yield ''.join(pending)
+                yield from parts[1:-1]
+                pending = []
+            last = parts[-1]
+            # End of chunk may be the beginning of separator.
+            head = last[len(last) - keep:] if keep else ''
+            pending.append(last[:len(last) - len(head)])
+        pending.append(head)
+        yield ''.join(pending)
+
+
+class LazyStringsList(collections.abc.Sequence):
+    """Read-only list of strings over binary data (no copy of it).
+    len() and indexing are O(1): only requested element is decoded.
+    """
+    def __init__(self, data: Union[bytes, memoryview]):
+        self._view = memoryview(data).cast('B')
+        try:
+            self._count, = BinaryStringsListSerializer.COUNT.unpack_from(
+                self._view)
+            self._payload = (BinaryStringsListSerializer.COUNT.size +
+                             BinaryStringsListSerializer.OFFSET.size *
+                             (self._count + 1))
+            # Offsets grow, so the last one is the payload length.
+            end, = BinaryStringsListSerializer.OFFSET.unpack_from(
+                self._view, self._payload -
+                BinaryStringsListSerializer.OFFSET.size)
+        except struct.error:
+            raise ValueError('Truncated strings list data.') from None
+        if self._payload + end != len(self._view):
+            raise ValueError('Strings list data length mismatch.')
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[q] for q in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('list index out of range')
+        start, end = BinaryStringsListSerializer.BOUNDS.unpack_from(
+            self._view, BinaryStringsListSerializer.COUNT.size +
+            BinaryStringsListSerializer.OFFSET.size * index)
+        return str(self._view[self._payload + start:self._payload + end],
+                   'utf-8')
+
+    def __repr__(self):
+        return 'LazyStringsList(%d strings)' % self._count
+
+
+# Array type code of 4 bytes unsigned int (item sizes are platform
+# dependent).
+_UINT32_TYPE = next(q for q in 'IL' if array.array(q).itemsize == 4)
+
+
+class BinaryStringsListSerializer(Serializer):
+    """Serializer class for lists of any strings, to bytes.
+    Format: count, (count + 1) offsets of strings in payload, payload
+    (UTF-8 strings one by one). All numbers are little-endian uint32.
+    deserialize() returns LazyStringsList.
+    """
+    COUNT = struct.Struct('<I')
+    OFFSET = struct.Struct('<I')
+    BOUNDS = struct.Struct('<II')
+
+    def serialize(self, strings_list: List[str]) -> bytes:
+        encoded = [string.encode() for string in strings_list]
+        try:
+            offsets = array.array(_UINT32_TYPE, itertools.accumulate(
+                map(len, encoded), initial=0))
+        except OverflowError:
+            raise ValueError('Payload is too big.')
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        return b''.join([self.COUNT.pack(len(encoded)), offsets.tobytes()] +
+                        encoded)
+
+    def deserialize(self, data: Union[bytes, memoryview]) -> LazyStringsList:
+        return LazyStringsList(data)
+
+    def dump(self, strings_list: List[str], stream: IO[bytes]):
+        """Write to binary stream.
+        """
+        stream.write(self.serialize(strings_list))
+
+    def load(self, source: Union[IO, Iterable]) -> LazyStringsList:
+        """Read from binary stream or iterator of bytes chunks.
+        """
+        if hasattr(source, 'read'):
+            return LazyStringsList(source.read())
+        return LazyStringsList(b''.join(source))
+
 
 # ----------------- JSON ADAPTER IMPLEMENTATION ---------------------- #
 
+# Reusable stdlib encoder and decoder: no per-call construction.
+_STDLIB_ENCODER = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+_STDLIB_DECODER = json.JSONDecoder()
+
+
+_JSON_LEAVES = frozenset((str, int, bool, type(None)))
+
+
+def _not_finite(data) -> bool:
+    """True if data has NaN or infinite floats anywhere inside.
+    """
+    stack = [data]
+    pop, extend = stack.pop, stack.extend
+    while stack:
+        value = pop()
+        kind = type(value)
+        if kind in _JSON_LEAVES:
+            continue
+        if kind is float:  # orjson does not encode float subclasses.
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            extend(value)
+    return False
+
+
+def _stdlib_loads(loads):
+    """loads(), falling back to stdlib on errors: like NaN and Infinity,
+    that stdlib reads and writes, but fast libraries do not.
+    """
+    def fallback(data):
+        try:
+            return loads(data)
+        except ValueError:
+            return _STDLIB_DECODER.decode(data)
+    return fallback
+
+
+def _json_backend():
+    """(name, dumps, loads) of the fastest installed JSON library.
+    Output and accepted input are the same as of stdlib in any case.
+    """
+    try:
+        import orjson
+    except ImportError:
+        pass
+    else:
+        def dumps(data):
+            try:
+                text = orjson.dumps(data).decode()
+            except TypeError:
+                # Like big ints: stdlib can encode them.
+                return _STDLIB_ENCODER.encode(data)
+            # orjson writes NaN and Infinity as null: look for them only
+            # if there is null in output.
+            if 'null' in text and _not_finite(data):
+                return _STDLIB_ENCODER.encode(data)
+            return text
+        return 'orjson', dumps, _stdlib_loads(orjson.loads)
+    try:
+        import ujson
+    except ImportError:
+        pass
+    else:
+        def dumps(data):
+            try:
+                return ujson.dumps(data, ensure_ascii=False)
+            except (OverflowError, TypeError):
+                # NaN and Infinity (in older versions), big ints.
+                return _STDLIB_ENCODER.encode(data)
+        return 'ujson', dumps, _stdlib_loads(ujson.loads)
+    return 'json', _STDLIB_ENCODER.encode, _STDLIB_DECODER.decode
+
+
+JSON_BACKEND, _json_dumps, _json_loads = _json_backend()
+
+
 class JsonSerializer(Serializer):
     """Adapter between JSON library used Serializer class.
+    Uses the fastest JSON library available (see JSON_BACKEND).
     """
+    _NUMBER_CHARS = frozenset('0123456789.eE+-')
+    _COMMA = re.compile(r'[ \t\n\r]*,[ \t\n\r]*')
+
     def serialize(self, data) -> str:
-        return json.dumps(data)
+        return _json_dumps(data)
 
     def deserialize(self, data: str):
-        return json.loads(data)
+        return _json_loads(data)
+
+    def dump(self, data, stream: IO[str]):
+        for chunk in _STDLIB_ENCODER.iterencode(data):
+            stream.write(chunk)
+
+    def iter_load(self, source: Union[IO, Iterable]) -> Iterator:
+        """Only text of current element (and one chunk) is kept in memory.
+        """
+        chunks = read_chunks(source)
+        scan = _STDLIB_DECODER.scan_once
+        buffer = ''
+        position = 0
+        expected = '['
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position == len(buffer):
+                chunk = next(chunks, None)
+                if chunk is None:
+                    raise ValueError('Unexpected end of JSON array.')
+                buffer, position = chunk, 0
+                continue
+            char = buffer[position]
+            if expected == '[':
+                if char != '[':
+                    raise ValueError('JSON array expected.')
+                position += 1
+                expected = 'first'
+            elif char == ']' and expected in ('first', ','):
+                return
+            elif expected == ',':
+                if char != ',':
+                    raise ValueError('"," expected at "%s".' % buffer[
+                        position:position + 20])
+                position += 1
+                expected = 'value'
+            else:
+                # Fast path: all complete elements before the last comma
+                # at once. If that comma is inside an element, brackets or
+                # quotes are unbalanced, so decoding fails.
+                cut = buffer.rfind(',', position)
+                if cut > position:
+                    try:
+                        elements = _STDLIB_DECODER.decode(
+                            '[%s]' % buffer[position:cut])
+                    except ValueError:
+                        pass
+                    else:
+                        yield from elements
+                        position = cut + 1
+                        expected = 'value'
+                        continue
+                while True:
+                    try:
+                        element, end = scan(buffer, position)
+                    except (StopIteration, ValueError):
+                        end = None
+                    # "12" or "1." at the end of buffer may be a part
+                    # of "123.4".
+                    if (end is None or end == len(buffer) or
+                            buffer[end] in self._NUMBER_CHARS):
+                        element, buffer, end = self._read_element(
+                            chunks, buffer, position)
+                        match = None
+                    else:
+                        match = self._COMMA.match(buffer, end)
+                    yield element
+                    if match is None or match.end() == len(buffer):
+                        position = end
+                        expected = ','
+                        break
+                    position = match.end()
+
+    def _read_element(self, chunks: Iterator[str], buffer: str,
+                      position: int):
+        """Decode element at buffer[position:], read more chunks if it is
+        incomplete: (element, buffer, position after element).
+        Incomplete element is re-parsed only when its text doubles,
+        so time is linear in its size.
+        """
+        finished = False
+        while True:
+            try:
+                element, end = _STDLIB_DECODER.raw_decode(buffer, position)
+            except ValueError:
+                if finished:
+                    raise
+            else:
+                if finished or (end < len(buffer) and
+                                buffer[end] not in self._NUMBER_CHARS):
+                    return element, buffer, end
+            pieces = [buffer[position:]]
+            size = len(pieces[0])
+            target = 2 * size
+            while not finished and (size < target or len(pieces) == 1):
+                chunk = next(chunks, None)
+                if chunk is None:
+                    finished = True
+                else:
+                    pieces.append(chunk)
+                    size += len(chunk)
+            buffer, position = ''.join(pieces), 0
+
+
+class StdlibJsonSerializer(JsonSerializer):
+    """JsonSerializer, that always uses standard json library.
+    """
+    def serialize(self, data) -> str:
+        return _STDLIB_ENCODER.encode(data)
+
+    def deserialize(self, data: str):
+        return _STDLIB_DECODER.decode(data)
+
+
+# ----------------- BINARY IMPLEMENTATION ---------------------- #
+
+class BinarySerializer(Serializer):
+    """Compact binary Serializer for JSON-like data (None, bool, int,
+    float, str, bytes, list, dict), to bytes.
+    Every value is a type tag byte + little-endian struct fields.
+    Small ints and short lengths take the short forms (1 byte).
+    """
+    # Tags of sized values: lowercase - 1 byte length, uppercase - 4 bytes.
+    NONE, TRUE, FALSE, FLOAT, INT8, INT64 = b'NTFdcq'
+    STR, LONG_STR, BYTES, LONG_BYTES = b'sSbB'
+    LIST, LONG_LIST, DICT, LONG_DICT = b'lLmM'
+    BIG_INT, LONG_BIG_INT = b'iI'
+
+    _TAG_INT8 = struct.Struct('<Bb')
+    _TAG_INT64 = struct.Struct('<Bq')
+    _TAG_FLOAT = struct.Struct('<Bd')
+    _TAG_SHORT = struct.Struct('<BB')
+    _TAG_LONG = struct.Struct('<BI')
+
+    def serialize(self, data) -> bytes:
+        parts = []
+        self._encode(data, parts.append)
+        return b''.join(parts)
+
+    def deserialize(self, data: Union[bytes, memoryview]):
+        view = memoryview(data).cast('B')
+        try:
+            result, position = self._decode(view, 0)
+        except (IndexError, struct.error) as error:
+            raise ValueError('Truncated data: %s.' % error) from None
+        except TypeError as error:  # Like list as dict key.
+            raise ValueError('Malformed data: %s.' % error) from None
+        except RecursionError:
+            raise ValueError('Data is nested too deep.') from None
+        if position != len(view):
+            raise ValueError('Extra data after position %d.' % position)
+        return result
+
+    def dump(self, data, stream: IO[bytes]):
+        """Write to binary stream, value by value.
+        """
+        self._encode(data, stream.write)
+
+    def load(self, source: Union[IO, Iterable]):
+        """Read from binary stream or iterator of bytes chunks.
+        """
+        if hasattr(source, 'read'):
+            return self.deserialize(source.read())
+        return self.deserialize(b''.join(source))
+
+    def _encode(self, value, write):
+        kind = type(value)
+        if kind is str:
+            self._write_sized(self.STR, value.encode(), write)
+        elif kind is int:
+            if -128 <= value < 128:
+                write(self._TAG_INT8.pack(self.INT8, value))
+            elif -(1 << 63) <= value < (1 << 63):
+                write(self._TAG_INT64.pack(self.INT64, value))
+            else:
+                self._write_sized(self.BIG_INT, str(value).encode(), write)
+        elif kind is float:
+            write(self._TAG_FLOAT.pack(self.FLOAT, value))
+        elif value is None:
+            write(b'N')
+        elif value is True:
+            write(b'T')
+        elif value is False:
+            write(b'F')
+        elif kind is dict:
+            self._write_length(self.DICT, len(value), write)
+            for key, item in value.items():
+                self._encode(key, write)
+                self._encode(item, write)
+        elif kind is list or kind is tuple:
+            self._write_length(self.LIST, len(value), write)
+            for item in value:
+                self._encode(item, write)
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            self._write_sized(self.BYTES, memoryview(value).cast('B'), write)
+        else:
+            raise TypeError('Type %s is not serializable.' % kind.__name__)
+
+    def _write_sized(self, tag: int, data, write):
+        self._write_length(tag, len(data), write)
+        write(data)
+
+    def _write_length(self, tag: int, length: int, write):
+        """Write tag and length: short form, or long (uppercase tag).
+        """
+        if length < 256:
+            write(self._TAG_SHORT.pack(tag, length))
+        else:
+            write(self._TAG_LONG.pack(tag - 0x20, length))
+
+    def _decode(self, view: memoryview, position: int):
+        """Decode value at position: (value, position after it).
+        """
+        tag = view[position]
+        if tag == self.INT8:
+            return self._TAG_INT8.unpack_from(view, position)[1], position + 2
+        if tag == self.INT64:
+            return self._TAG_INT64.unpack_from(view, position)[1], position + 9
+        if tag == self.FLOAT:
+            return self._TAG_FLOAT.unpack_from(view, position)[1], position + 9
+        if tag == self.NONE:
+            return None, position + 1
+        if tag == self.TRUE:
+            return True, position + 1
+        if tag == self.FALSE:
+            return False, position + 1
+        if tag < 0x61:  # uppercase: long form length
+            length, = self._TAG_LONG.unpack_from(view, position)[1:]
+            start = position + 5
+            tag += 0x20
+        else:
+            length = view[position + 1]
+            start = position + 2
+        end = start + length
+        if tag == self.STR:
+            if end > len(view):
+                raise IndexError('string is out of data')
+            return str(view[start:end], 'utf-8'), end
+        if tag == self.DICT:
+            result = {}
+            for _ in range(length):
+                key, start = self._decode(view, start)
+                result[key], start = self._decode(view, start)
+            return result, start
+        if tag == self.LIST:
+            result = []
+            for _ in range(length):
+                item, start = self._decode(view, start)
+                result.append(item)
+            return result, start
+        if tag == self.BYTES:
+            if end > len(view):
+                raise IndexError('bytes are out of data')
+            return bytes(view[start:end]), end
+        if tag == self.BIG_INT:
+            if end > len(view):
+                raise IndexError('big int is out of data')
+            return int(str(view[start:end], 'ascii')), end
+        raise ValueError('Unknown tag %r at position %d.' % (chr(tag),
+                                                            position))
+
+
+# ----------------- REGISTRY ---------------------- #
+
+SERIALIZERS = {
+    'strings': StringsListSerializer,
+    'binary-strings': BinaryStringsListSerializer,
+    'json': JsonSerializer,
+    'json-stdlib': StdlibJsonSerializer,
+    'binary': BinarySerializer,
+}
+
+
+def get_serializer(name: str) -> Serializer:
+    """Serializer instance by registered name.
+    """
+    try:
+        return SERIALIZERS[name]()
+    except KeyError:
+        raise ValueError('Unknown serializer "%s".' % name)
 
 
 # --------------------------- TEST --------------------------------
@@ -83,5 +605,17 @@ if __name__ == '__main__':
     string_list_client.run(test_data)
     json_client = Client(JsonSerializer())
     json_client.run(test_data)
+    binary_client = Client(BinaryStringsListSerializer())
+    binary_client.run(test_data)
+    print('JSON backend:', JSON_BACKEND)
+    Client(get_serializer('binary')).run({'list': test_data, 'n': 1.5})
+
+    import io
+    for serializer in (StringsListSerializer(), JsonSerializer()):
+        stream = io.StringIO()
+        serializer.dump(test_data, stream)
+        stream.seek(0)
+        print('"%s" streaming: %s' % (serializer.__class__.__name__,
+                                      list(serializer.iter_load(stream))))
 
 
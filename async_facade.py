@@ -0,0 +1,311 @@
+#-----------------------------------------------------------------------------#
+# Name:         async_facade.py
+# Author:       Ryoga
+# Created:      17.10.2026
+# Description:  Asyncio version of facade.py: remote storage, that is
+#               really remote (TCP), and simple facade for it.
+#               Plus small local storage server, for tests and benchmarks.
+#               Frame: header (body length, request id, code) + body.
+#-----------------------------------------------------------------------------#
+
+
+import asyncio
+import itertools
+import struct
+import time
+from typing import Tuple
+
+from facade import RemoteStorage
+
+
+HEADER = struct.Struct('!IIB')
+KEY_LENGTH = struct.Struct('!H')
+
+# Request codes.
+PUT = 1
+GET = 2
+CHECK = 3
+
+# Response codes.
+OK = 0
+NOT_FOUND = 1
+ERROR = 2
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, int, bytes]:
+    """Read one frame: (request id, code, body).
+    """
+    length, request_id, code = HEADER.unpack(
+        await reader.readexactly(HEADER.size))
+    return request_id, code, await reader.readexactly(length)
+
+
+def pack_frame(request_id: int, code: int, body: bytes = b'') -> bytes:
+    return HEADER.pack(len(body), request_id, code) + body
+
+
+# -------------------- SERVER ------------------------- #
+
+class StorageServer:
+    """Local stand-in of remote storage server. Stores data in memory.
+    Requests of one connection are served concurrently, so responses
+    may come in any order. "latency" simulates slow storage.
+    """
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0):
+        self._host = host
+        self._port = port
+        self._latency = latency
+        self._storage = {}
+        self._server = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self._host,
+                                                  self._port)
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter):
+        tasks = set()
+        try:
+            while True:
+                request_id, code, body = await read_frame(reader)
+                task = asyncio.ensure_future(
+                    self._respond(writer, request_id, code, body))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, request_id: int,
+                       code: int, body: bytes):
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        if code == PUT:
+            start = KEY_LENGTH.size
+            if len(body) >= start:
+                start += KEY_LENGTH.unpack_from(body)[0]
+            if start > len(body):  # Short or malformed body.
+                response = pack_frame(request_id, ERROR, b'Malformed PUT.')
+            else:
+                key = bytes(body[KEY_LENGTH.size:start])
+                self._storage[key] = body[start:]
+                response = pack_frame(request_id, OK)
+        elif code == GET:
+            data = self._storage.get(body)
+            if data is None:
+                response = pack_frame(request_id, NOT_FOUND)
+            else:
+                response = pack_frame(request_id, OK, data)
+        elif code == CHECK:
+            response = pack_frame(request_id, OK)
+        else:
+            response = pack_frame(request_id, ERROR, b'Unknown request.')
+        if not writer.is_closing():
+            writer.write(response)
+
+
+# -------------------- CLIENT ------------------------- #
+
+class AsyncRemoteStorage:
+    """Async remote storage client, same API as facade.RemoteStorage.
+    Each connection multiplexes many requests: responses are matched
+    to requests by id.
+    """
+    State = RemoteStorage.State
+
+    class RemoteError(Exception):
+        pass
+
+    class Connection:
+        """Storage connection object.
+        """
+        def __init__(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter):
+            self._reader = reader
+            self._writer = writer
+            self._ids = itertools.count(1)
+            self._waiters = {}
+            self._receiver = asyncio.ensure_future(self._receive())
+
+        @property
+        def in_flight(self) -> int:
+            return len(self._waiters)
+
+        async def put(self, key: str, data: str):
+            key = key.encode()
+            await self._request(PUT, KEY_LENGTH.pack(len(key)) + key +
+                                data.encode())
+
+        async def get(self, key: str) -> str:
+            code, body = await self._request(GET, key.encode(),
+                                             NOT_FOUND)
+            return None if code == NOT_FOUND else body.decode()
+
+        async def check(self) -> bool:
+            await self._request(CHECK)
+            return True
+
+        def ping(self) -> bool:
+            return not self._receiver.done()
+
+        async def close(self):
+            self._writer.close()
+            self._receiver.cancel()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+
+        async def _request(self, code: int, body: bytes = b'',
+                           *allowed: int) -> Tuple[int, bytes]:
+            if self._receiver.done():
+                raise ConnectionError('Connection is closed.')
+            request_id = next(self._ids) & 0xFFFFFFFF
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[request_id] = future
+            self._writer.write(pack_frame(request_id, code, body))
+            code, body = await future
+            if code != OK and code not in allowed:
+                raise AsyncRemoteStorage.RemoteError(body.decode())
+            return code, body
+
+        async def _receive(self):
+            """Read responses, resolve waiting requests by id.
+            Waiting requests fail, if receiver stops for any reason.
+            """
+            failure = ConnectionError('Connection is closed.')
+            try:
+                while True:
+                    request_id, code, body = await read_frame(self._reader)
+                    future = self._waiters.pop(request_id, None)
+                    if future is not None and not future.done():
+                        future.set_result((code, body))
+            except (asyncio.IncompleteReadError, ConnectionError) as error:
+                failure = ConnectionError('Connection lost: %r' % error)
+            except asyncio.CancelledError:
+                pass
+            except Exception as error:
+                failure = ConnectionError('Receiver failed: %r' % error)
+                raise
+            finally:
+                for future in self._waiters.values():
+                    if not future.done():
+                        future.set_exception(failure)
+                self._waiters.clear()
+
+    async def connect(self, address: Tuple[str, int]
+                      ) -> 'AsyncRemoteStorage.Connection':
+        """connect to storage.
+        """
+        reader, writer = await asyncio.open_connection(*address)
+        return AsyncRemoteStorage.Connection(reader, writer)
+
+    async def check(self, address: Tuple[str, int]) -> State:
+        """Check remote storage state (opens separate connection).
+        """
+        try:
+            connection = await self.connect(address)
+        except OSError:
+            return AsyncRemoteStorage.State.NOT_EXISTS
+        try:
+            await connection.check()
+            return AsyncRemoteStorage.State.AVAILABLE
+        except (ConnectionError, AsyncRemoteStorage.RemoteError):
+            return AsyncRemoteStorage.State.TEMPORARY_NOT_AVAILABLE
+        finally:
+            await connection.close()
+
+
+class AsyncRemoteStorageFacade:
+    """Simple async facade for AsyncRemoteStorage.
+    Requests are spread over pool_size multiplexed connections
+    (the least loaded one is used). Availability check is cached for
+    check_ttl seconds.
+    """
+    class NotAvailableError(Exception):
+        pass
+
+    def __init__(self, address: Tuple[str, int], pool_size: int = 2,
+                 check_ttl: float = 1.0):
+        self._remote_storage = AsyncRemoteStorage()
+        self._address = address
+        self._pool_size = pool_size
+        self._check_ttl = check_ttl
+        self._checked_at = None
+        self._connections = []
+        self._connecting = None
+
+    async def put(self, key: str, data: str):
+        connection = await self._connection()
+        await connection.put(key, data)
+
+    async def get(self, key: str) -> str:
+        connection = await self._connection()
+        return await connection.get(key)
+
+    async def close(self):
+        connections, self._connections = self._connections, []
+        for connection in connections:
+            await connection.close()
+
+    async def _connection(self) -> AsyncRemoteStorage.Connection:
+        await self._check_remote_storage()
+        dead = [q for q in self._connections if not q.ping()]
+        if dead:
+            self._connections = [q for q in self._connections if q.ping()]
+            for connection in dead:
+                await connection.close()
+        if len(self._connections) < self._pool_size:
+            # One connect at a time: concurrent callers share it.
+            if self._connecting is None:
+                self._connecting = asyncio.ensure_future(
+                    self._remote_storage.connect(self._address))
+            connecting = self._connecting
+            try:
+                connection = await asyncio.shield(connecting)
+            finally:
+                if self._connecting is connecting:
+                    self._connecting = None
+            if connection not in self._connections:
+                self._connections.append(connection)
+        return min(self._connections, key=lambda q: q.in_flight)
+
+    async def _check_remote_storage(self):
+        now = time.monotonic()
+        if (self._checked_at is not None and
+                now - self._checked_at < self._check_ttl):
+            return
+        state = await self._remote_storage.check(self._address)
+        if state != AsyncRemoteStorage.State.AVAILABLE:
+            self._checked_at = None
+            raise self.NotAvailableError
+        self._checked_at = now
+
+
+# --------------------------- TEST --------------------------------
+
+async def _demo():
+    server = StorageServer()
+    await server.start()
+    facade = AsyncRemoteStorageFacade(server.address)
+    await facade.put('some_key', 'some_value')
+    print('Got:', await facade.get('some_key'))
+    print('Got:', await asyncio.gather(*[facade.get('some_key')
+                                          for _ in range(3)]))
+    print('Got:', await facade.get('missing_key'))
+    await facade.close()
+    await server.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(_demo())
@@ -0,0 +1,296 @@
+#-----------------------------------------------------------------------------#
+# Name:         async_storage.py
+# Author:       Ryoga
+# Created:      17.10.2026
+# Description:  Asyncio versions of Storage stack from proxy.py and
+#               decorator.py: storages, caching proxy, decorators.
+#               Plus adapter, that plugs old synchronous Storage into
+#               async stack (runs it in a bounded thread pool).
+#-----------------------------------------------------------------------------#
+
+import abc
+import asyncio
+import concurrent.futures
+from typing import Dict, Iterable
+
+from proxy import Cache, Storage
+
+
+# -------------------- INTERFACES ------------------------- #
+
+class AsyncStorage(abc.ABC):
+    """Interface for async Storage class.
+    """
+    @abc.abstractmethod
+    async def put(self, key: str, data: str):
+        """Put data to storage, using key,
+        """
+        pass
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> str:
+        """Get data by key from storage,
+        """
+        pass
+
+    async def put_many(self, items: Dict[str, str]):
+        """Put many key-data pairs to storage.
+        Default: one put() per key, override for real batching.
+        """
+        for key, data in items.items():
+            await self.put(key, data)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Get many keys from storage, as {key: data} dict.
+        Default: one get() per key, override for real batching.
+        """
+        return {key: await self.get(key) for key in keys}
+
+
+class AsyncStorageDecorator(AsyncStorage):
+    """Abstract async Storage Decorator class.
+    """
+    def __init__(self, component: AsyncStorage):
+        """Init decorator, set component's value.
+        """
+        self._component = component
+
+
+# ------------------ IMPLEMENTATION ----------------------- #
+
+class AsyncMemoryStorage(AsyncStorage):
+    """Async storage class, that stores data in memory.
+    """
+    def __init__(self):
+        self._storage = {}
+
+    async def put(self, key: str, data: str):
+        self._storage[key] = data
+
+    async def get(self, key: str) -> str:
+        return self._storage.get(key)
+
+    async def put_many(self, items: Dict[str, str]):
+        self._storage.update(items)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        return {key: self._storage.get(key) for key in keys}
+
+
+class AsyncRemoteStorage(AsyncStorage):
+    """Async storage class, that stores data in memory, but pretends
+    to be remote: every call (single or batch) waits "latency" seconds.
+    """
+    def __init__(self, latency: float = 0):
+        self._storage = {}
+        self._latency = latency
+
+    async def put(self, key: str, data: str):
+        print(' - put "%s" data to remote storage.' % key)
+        await asyncio.sleep(self._latency)
+        self._storage[key] = data
+
+    async def get(self, key: str) -> str:
+        print(' - get "%s" key from remote storage.' % key)
+        await asyncio.sleep(self._latency)
+        return self._storage.get(key)
+
+    async def put_many(self, items: Dict[str, str]):
+        print(' - put %d keys to remote storage.' % len(items))
+        await asyncio.sleep(self._latency)
+        self._storage.update(items)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(keys)
+        print(' - get %d keys from remote storage.' % len(keys))
+        await asyncio.sleep(self._latency)
+        return {key: self._storage.get(key) for key in keys}
+
+
+class AsyncStorageLoggerDecorator(AsyncStorageDecorator):
+    """Logging decorator class, for async Storage class.
+    Log to console when put() and get() methods are called.
+    """
+    async def put(self, key: str, data: str):
+        print(' - put "%s:%s"' % (key, data))
+        return await self._component.put(key, data)
+
+    async def get(self, key: str) -> str:
+        data = await self._component.get(key)
+        print(' - get "%s" key ("%s" data)' % (key, data))
+        return data
+
+    async def put_many(self, items: Dict[str, str]):
+        print(' - put %d keys: %s' % (len(items), ', '.join(items)))
+        return await self._component.put_many(items)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        result = await self._component.get_many(keys)
+        print(' - get %d keys: %s' % (len(result), ', '.join(result)))
+        return result
+
+
+class AsyncStoragePrefixDecorator(AsyncStorageDecorator):
+    """Content enchncing decorator class, for async Storage class.
+    Adds some prefix when string is gotten from Storage.
+    """
+    PREFIX = 'prefix@'
+
+    async def get(self, key: str) -> str:
+        return self.PREFIX + await self._component.get(key)
+
+    async def put(self, key: str, data: str):
+        return await self._component.put(key, self._remove_prefix(data))
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        result = await self._component.get_many(keys)
+        return {key: self.PREFIX + data for key, data in result.items()}
+
+    async def put_many(self, items: Dict[str, str]):
+        items = {key: self._remove_prefix(data) for key, data in items.items()}
+        return await self._component.put_many(items)
+
+    @classmethod
+    def _remove_prefix(cls, data: str):
+        if data.startswith(cls.PREFIX):
+            return data.split('@', 1)[1]
+        else:
+            return data
+
+
+class AsyncProxyStorage(AsyncStorage):
+    """Caching proxy class, for async Storage class.
+    Concurrent awaits of the same missed key share one target call.
+    All misses of one get_many() are fetched by one target call.
+    Like sync ProxyStorage, put() does not touch the cache.
+    """
+    TIMEDELTA = 5
+
+    def __init__(self, target_storage: AsyncStorage, cache: Cache = None):
+        self._target_storage = target_storage
+        if cache is None:
+            cache = Cache(ttl=self.TIMEDELTA)
+        self._cache = cache
+        self._inflight = {}
+        self._tasks = set()
+
+    async def put(self, key: str, data: str):
+        return await self._target_storage.put(key, data)
+
+    async def put_many(self, items: Dict[str, str]):
+        return await self._target_storage.put_many(items)
+
+    async def get(self, key: str) -> str:
+        return (await self.get_many([key]))[key]
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        result = {}
+        waiting = {}
+        misses = []
+        loop = asyncio.get_running_loop()
+        for key in keys:
+            if key in result or key in waiting:
+                continue
+            data = self._cache.get(key)
+            if data is not Cache.MISSING:
+                result[key] = data
+            elif key in self._inflight:
+                waiting[key] = self._inflight[key]
+            else:
+                misses.append(key)
+                waiting[key] = self._inflight[key] = loop.create_future()
+        if misses:
+            # Keep a reference: event loop holds tasks only weakly.
+            task = loop.create_task(self._fetch_many(misses))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        for key, future in waiting.items():
+            # Shield: one cancelled caller must not cancel shared fetch.
+            result[key] = await asyncio.shield(future)
+        return result
+
+    async def _fetch_many(self, keys: Iterable[str]):
+        """Get data from target storage and publish it to waiters.
+        Every waiter gets result or error, even if fetch is cancelled.
+        """
+        try:
+            fetched = await self._target_storage.get_many(keys)
+            for key in keys:
+                self._cache.put(key, fetched.get(key))
+        except BaseException as error:
+            failure = error
+            if not isinstance(error, Exception):
+                failure = ConnectionError('Fetch is cancelled.')
+            for key in keys:
+                future = self._inflight.pop(key)
+                if not future.done():
+                    future.set_exception(failure)
+            if failure is not error:
+                raise
+            return
+        for key in keys:
+            future = self._inflight.pop(key)
+            if not future.done():
+                future.set_result(fetched.get(key))
+        print(' - cached %s' % ', '.join('"%s"' % q for q in keys))
+
+
+# -------------------- SYNC ADAPTER ------------------------- #
+
+class SyncStorageAdapter(AsyncStorage):
+    """Adapter: old synchronous Storage as async one.
+    Blocking calls run in a bounded thread pool, so event loop
+    is never blocked and backend gets at most max_workers calls at once.
+    """
+    def __init__(self, storage: Storage, max_workers: int = 4):
+        self._storage = storage
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='sync-storage')
+
+    async def put(self, key: str, data: str):
+        return await self._run(self._storage.put, key, data)
+
+    async def get(self, key: str) -> str:
+        return await self._run(self._storage.get, key)
+
+    async def put_many(self, items: Dict[str, str]):
+        return await self._run(self._storage.put_many, items)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        return await self._run(self._storage.get_many, list(keys))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+
+# ------------------------- TEST --------------------------- #
+
+async def _demo():
+    print('Async proxy coalescing test:')
+    storage = AsyncRemoteStorage(latency=0.1)
+    await storage.put('some_key', 'some_value')
+    proxy = AsyncProxyStorage(storage)
+    print('Got:', await asyncio.gather(*[proxy.get('some_key')
+                                          for _ in range(5)]))
+
+    print('\nAsync decorators test:')
+    decorator = AsyncStoragePrefixDecorator(
+        AsyncStorageLoggerDecorator(AsyncMemoryStorage()))
+    await decorator.put_many({'key_1': 'prefix@value_1', 'key_2': 'value_2'})
+    print('Got:', await decorator.get_many(['key_1', 'key_2']))
+
+    print('\nSync storage adapter test:')
+    from proxy import RemoteStorage
+    adapter = SyncStorageAdapter(RemoteStorage(), max_workers=2)
+    proxy = AsyncProxyStorage(adapter)
+    await proxy.put('some_key', 'some_value')
+    print('Got:', await proxy.get('some_key'))
+    adapter.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(_demo())
@@ -0,0 +1,161 @@
+#-----------------------------------------------------------------------------#
+# Name:         abstract_factory_bench.py
+# Author:       Ryoga
+# Created:      17.10.2026
+# Description:  Benchmarks of abstract_factory.py Application.
+#               Run: python -m benchmarks.abstract_factory_bench
+#-----------------------------------------------------------------------------#
+
+
+import asyncio
+import concurrent.futures
+import time
+
+from abstract_factory import (Application, CloudDB, CloudQueue,
+                              CloudServicesFactory, CloudStorage,
+                              LocalServicesFactory)
+from benchmarks.common import percentile, quiet, report
+
+
+LATENCY = 0.01
+
+
+class _Slow:
+    """Client wrapper: every call waits LATENCY seconds.
+    """
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        def slow(*args):
+            time.sleep(LATENCY)
+            return method(*args)
+        return slow
+
+
+class SlowServicesFactory(CloudServicesFactory):
+    """Wrapper of factory, that injects backend latency.
+    """
+    def __init__(self, factory: CloudServicesFactory):
+        self._factory = factory
+
+    def get_storage(self, name) -> CloudStorage:
+        return _Slow(self._factory.get_storage(name))
+
+    def get_db_connection(self, name) -> CloudDB:
+        return _Slow(self._factory.get_db_connection(name))
+
+    def get_message_queue(self, name) -> CloudQueue:
+        return _Slow(self._factory.get_message_queue(name))
+
+
+def concurrent_steps(factory: CloudServicesFactory, runs: int = 20):
+    """End-to-end latency of Application.proceed(): sequential steps,
+    steps on thread pool and on asyncio loop.
+    """
+    slow_factory = SlowServicesFactory(factory)
+    rows = []
+    with quiet(), concurrent.futures.ThreadPoolExecutor(6) as executor:
+        variants = [
+            ('sequential', Application(slow_factory).proceed),
+            ('thread pool', Application(slow_factory, executor).proceed),
+            ('asyncio', lambda: asyncio.run(
+                Application(slow_factory).proceed_async())),
+        ]
+        for title, proceed in variants:
+            started = time.perf_counter()
+            for _ in range(runs):
+                proceed()
+            rows.append({'steps': title, 'ms per proceed': (
+                time.perf_counter() - started) / runs * 1000})
+    report('Application.proceed(), %d ms per backend call:' % (
+               LATENCY * 1000), rows, ['steps', 'ms per proceed'])
+
+
+def target_rate(rates=(50, 100, 200), duration: float = 2.0,
+                workers: int = 16):
+    """Open-loop load: Application.proceed() is started at fixed request
+    rate on local stand-ins (1 ms +- 0.5 ms latency, 1% errors).
+    Latency is counted from scheduled start, so queueing is included.
+    """
+    rows = []
+    for rate in rates:
+        factory = LocalServicesFactory(latency=0.001, jitter=0.0005,
+                                       error_rate=0.01, seed=1)
+        application = Application(factory)
+        latencies = []
+        errors = []
+
+        def request(scheduled):
+            try:
+                application.proceed()
+            except Exception as error:
+                errors.append(error)
+            latencies.append(time.perf_counter() - scheduled)
+
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            started = time.perf_counter()
+            for index in range(int(rate * duration)):
+                scheduled = started + index / rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(request, scheduled)
+        elapsed = time.perf_counter() - started
+        application.close()
+        factory.close()
+        rows.append({
+            'target rps': rate,
+            'done rps': int(len(latencies) / elapsed),
+            'errors': len(errors),
+            'p50, ms': percentile(latencies, 50) * 1000,
+            'p99, ms': percentile(latencies, 99) * 1000,
+            'p99.9, ms': percentile(latencies, 99.9) * 1000,
+        })
+    report('Application.proceed() on local stand-ins, open-loop:', rows,
+           ['target rps', 'done rps', 'errors', 'p50, ms', 'p99, ms',
+            'p99.9, ms'])
+
+
+def sql_batching(rows_count: int = 20000):
+    """Local sqlite DB: rows inserted one by one vs executemany(),
+    repeated query with and without prepared statements cache,
+    full fetch vs streaming cursor.
+    """
+    rows = []
+    for cache_size in (0, 128):
+        factory = LocalServicesFactory(statement_cache_size=cache_size)
+        db = factory.get_db_connection('bench')
+        db.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)')
+        insert = 'INSERT INTO items VALUES (?, ?)'
+        started = time.perf_counter()
+        for index in range(rows_count // 10):
+            db.execute(insert, (index, 'item'))
+        one_by_one = (time.perf_counter() - started) / (rows_count // 10)
+        started = time.perf_counter()
+        db.executemany(insert, ((q, 'item') for q in
+                                range(rows_count // 10, rows_count)))
+        batched = (time.perf_counter() - started) / (rows_count * 9 // 10)
+        started = time.perf_counter()
+        for index in range(rows_count // 10):
+            db.execute('SELECT name FROM items WHERE id = ?', (index,))
+        select = (time.perf_counter() - started) / (rows_count // 10)
+        started = time.perf_counter()
+        total = sum(1 for _ in db.iter_rows('SELECT * FROM items'))
+        streamed = time.perf_counter() - started
+        factory.close()
+        rows.append({'statement cache': cache_size,
+                     'insert, us': one_by_one * 1e6,
+                     'executemany, us': batched * 1e6,
+                     'select, us': select * 1e6,
+                     'stream %d, ms' % total: streamed * 1000})
+    report('Local sqlite DB, per row:', rows, list(rows[0]))
+
+
+if __name__ == '__main__':
+    from abstract_factory import AmazonWebServicesFactory
+    concurrent_steps(AmazonWebServicesFactory())
+    target_rate()
+    sql_batching()
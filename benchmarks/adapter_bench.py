@@ -0,0 +1,56 @@
+#-----------------------------------------------------------------------------#
+# Name:         adapter_bench.py
+# Author:       Ryoga
+# Created:      17.10.2026
+# Description:  Benchmarks of adapter.py lazy strings lists access.
+#               All registered serializers: serializer_bench.py.
+#               Run: python -m benchmarks.adapter_bench
+#-----------------------------------------------------------------------------#
+
+
+import random
+import time
+
+from adapter import BinaryStringsListSerializer, StringsListSerializer
+from benchmarks.common import report
+
+
+def strings_lists(counts=(1000, 100000), accesses: int = 1000):
+    """Separator format vs binary offsets format: size, encode time,
+    and time to get len() and "accesses" random elements from data.
+    """
+    rows = []
+    rnd = random.Random(1)
+    for count in counts:
+        strings = ['строка_%d_%s' % (q, 'x' * rnd.randint(0, 30))
+                   for q in range(count)]
+        indexes = [rnd.randrange(count) for _ in range(accesses)]
+        for serializer in (StringsListSerializer(),
+                           BinaryStringsListSerializer()):
+            started = time.perf_counter()
+            data = serializer.serialize(strings)
+            encoded = time.perf_counter() - started
+            if isinstance(data, str):
+                data = data.encode()
+            size = len(data)
+            started = time.perf_counter()
+            for index in indexes:
+                # Separator format must be decoded and split every time.
+                strings_list = serializer.deserialize(
+                    data if isinstance(serializer,
+                                       BinaryStringsListSerializer)
+                    else data.decode())
+                len(strings_list)
+                strings_list[index]
+            access = (time.perf_counter() - started) / accesses
+            rows.append({'strings': count,
+                         'format': serializer.__class__.__name__,
+                         'bytes': size,
+                         'encode, ms': encoded * 1000,
+                         'len+item, us': access * 1e6})
+    report('Strings lists:', rows,
+           ['strings', 'format', 'bytes', 'encode, ms', 'len+item, us'])
+
+
+if __name__ == '__main__':
+    strings_lists()
@@ -0,0 +1,65 @@
+#-----------------------------------------------------------------------------#
+# Name:         async_facade_bench.py
+# Author:       Ryoga
+# Created:      17.10.2026
+# Description:  Load generator for async_facade.py over local TCP server.
+#               Reports throughput and latency percentiles by concurrency
+#               and connections pool size.
+#               Run: python -m benchmarks.async_facade_bench
+#-----------------------------------------------------------------------------#
+
+
+import asyncio
+import time
+
+from async_facade import AsyncRemoteStorageFacade, StorageServer
+from benchmarks.common import percentile, report
+
+
+DURATION = 2.0
+SERVER_LATENCY = 0.001
+
+
+async def _load(facade: AsyncRemoteStorageFacade, concurrency: int) -> dict:
+    latencies = []
+    deadline = time.perf_counter() + DURATION
+
+    async def worker(number: int):
+        key = 'key_%d' % number
+        await facade.put(key, 'value' * 20)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await facade.get(key)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(q) for q in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return {
+        'req/s': int(len(latencies) / elapsed),
+        'p50, ms': percentile(latencies, 50) * 1000,
+        'p95, ms': percentile(latencies, 95) * 1000,
+        'p99, ms': percentile(latencies, 99) * 1000,
+    }
+
+
+async def main():
+    server = StorageServer(latency=SERVER_LATENCY)
+    await server.start()
+    rows = []
+    for pool_size in (1, 4):
+        for concurrency in (1, 16, 128):
+            facade = AsyncRemoteStorageFacade(server.address,
+                                              pool_size=pool_size)
+            row = {'connections': pool_size, 'concurrency': concurrency}
+            row.update(await _load(facade, concurrency))
+            await facade.close()
+            rows.append(row)
+    await server.close()
+    report('Async facade, %.1f ms server latency:' % (SERVER_LATENCY * 1000),
+           rows, ['connections', 'concurrency', 'req/s', 'p50, ms',
+                  'p95, ms', 'p99, ms'])
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
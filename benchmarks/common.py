@@ -0,0 +1,78 @@
+#-----------------------------------------------------------------------------#
+# Name:         common.py
+# Author:       Ryoga
+# Created:      17.10.2026
+# Description:  Small helpers shared by benchmark scripts.
+#               Run any benchmark from the repository root, like:
+#               python -m benchmarks.proxy_bench
+#-----------------------------------------------------------------------------#
+
+
+import contextlib
+import sys
+import time
+
+
+class _NullWriter:
+    """Stdout sink: demo classes print a lot, benchmarks don't need it.
+    """
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+@contextlib.contextmanager
+def quiet():
+    """Suppress stdout inside "with" block.
+    """
+    stdout = sys.stdout
+    sys.stdout = _NullWriter()
+    try:
+        yield
+    finally:
+        sys.stdout = stdout
+
+
+def percentile(values, percent: float) -> float:
+    """Nearest-rank percentile of values.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1,
+                       int(round(percent / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def per_op(func, repeat: int, rounds: int = 5) -> float:
+    """Call func() "repeat" times, return mean seconds per call
+    (best of "rounds" tries, to filter out noise).
+    """
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        elapsed = (time.perf_counter() - started) / repeat
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(title: str, rows, columns):
+    """Print rows (list of dicts) as a plain text table.
+    """
+    cells = [[_format(row[column]) for column in columns] for row in rows]
+    widths = [max([len(column)] + [len(line[index]) for line in cells])
+              for index, column in enumerate(columns)]
+    print('\n%s' % title)
+    print('  '.join(c.rjust(w) for c, w in zip(columns, widths)))
+    for line in cells:
+        print('  '.join(c.rjust(w) for c, w in zip(line, widths)))
+
+
+def _format(value):
+    if isinstance(value, float):
+        return '%.3f' % value
+    return str(value)
@@ -0,0 +1,137 @@
+#-----------------------------------------------------------------------------#
+# Name:         decorator_bench.py
+# Author:       Ryoga
+# Created:      17.10.2026
+# Description:  Benchmarks of decorator.py storages.
+#               Run: python -m benchmarks.decorator_bench
+#-----------------------------------------------------------------------------#
+
+
+import random
+import threading
+import time
+
+from benchmarks.common import per_op, quiet, report
+from decorator import (FusedStorage, MemoryStorage,
+                       QueuedStorageLoggerDecorator, ShardedMemoryStorage,
+                       StorageLoggerDecorator, StoragePrefixDecorator)
+
+
+OPS_PER_THREAD = 50000
+KEYS = ['key_%d' % q for q in range(10000)]
+
+
+class LockedMemoryStorage(MemoryStorage):
+    """Baseline: MemoryStorage made thread-safe with one global lock.
+    """
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def put(self, key: str, data: str):
+        with self._lock:
+            super().put(key, data)
+
+    def get(self, key: str) -> str:
+        with self._lock:
+            return super().get(key)
+
+
+def _worker(storage, seed: int):
+    rnd = random.Random(seed)
+    keys = rnd.choices(KEYS, k=OPS_PER_THREAD)
+    for index, key in enumerate(keys):
+        if index % 4:
+            storage.get(key)
+        else:
+            storage.put(key, 'value')
+
+
+def sharded_throughput(thread_counts=(1, 2, 4, 8, 16)):
+    """Ops/second of memory storages, 3 gets per 1 put.
+    """
+    rows = []
+    for threads_count in thread_counts:
+        row = {'threads': threads_count}
+        for storage_class in (MemoryStorage, LockedMemoryStorage,
+                              ShardedMemoryStorage):
+            storage = storage_class()
+            threads = [threading.Thread(target=_worker, args=(storage, q))
+                       for q in range(threads_count)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            row[storage_class.__name__] = int(
+                threads_count * OPS_PER_THREAD / elapsed)
+        rows.append(row)
+    report('Throughput, ops/s:', rows,
+           ['threads', 'MemoryStorage', 'LockedMemoryStorage',
+            'ShardedMemoryStorage'])
+
+
+class _NullStream:
+    def write(self, text):
+        pass
+
+
+def logging_overhead(repeat: int = 200000, rounds: int = 5):
+    """Per-op cost of put()+get() through logging decorators.
+    """
+    def queued(**kwargs):
+        return QueuedStorageLoggerDecorator(MemoryStorage(),
+                                            stream=_NullStream(), **kwargs)
+
+    disabled = queued()
+    disabled.enabled = False
+    variants = [
+        ('no logging', MemoryStorage()),
+        ('print logger', StorageLoggerDecorator(MemoryStorage())),
+        # Two records per operation, in every round.
+        ('queued, all', queued(queue_size=repeat * 2 * rounds)),
+        ('queued, 1/100', queued(sample_every=100)),
+        ('queued, 1000/s', queued(max_per_second=1000)),
+        ('queued, tiny queue', queued(queue_size=10)),
+        ('queued, disabled', disabled),
+    ]
+    rows = []
+    with quiet():
+        for title, storage in variants:
+            def operation():
+                storage.put('key', 'value')
+                storage.get('key')
+            rows.append({'logger': title,
+                         'us per op': per_op(operation, repeat,
+                                             rounds) * 1e6 / 2,
+                         'dropped': getattr(storage, 'dropped', 0)})
+            if hasattr(storage, 'close'):
+                storage.close()
+    report('Logging overhead:', rows, ['logger', 'us per op', 'dropped'])
+
+
+def fusion(depths=(0, 1, 2, 4, 8, 16), repeat: int = 100000):
+    """Per-op cost of put()+get() by prefix decorators stack depth:
+    usual delegation vs FusedStorage.
+    """
+    rows = []
+    for depth in depths:
+        stack = MemoryStorage()
+        for _ in range(depth):
+            stack = StoragePrefixDecorator(stack)
+        row = {'depth': depth}
+        for title, storage in (('stacked, us', stack),
+                               ('fused, us', FusedStorage(stack))):
+            def operation():
+                storage.put('key', 'value')
+                storage.get('key')
+            row[title] = per_op(operation, repeat) * 1e6 / 2
+        rows.append(row)
+    report('Decorators fusion:', rows, ['depth', 'stacked, us', 'fused, us'])
+
+
+if __name__ == '__main__':
+    sharded_throughput()
+    logging_overhead()
+    fusion()
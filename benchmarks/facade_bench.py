@@ -0,0 +1,65 @@
+#-----------------------------------------------------------------------------#
+# Name:         facade_bench.py
+# Author:       Ryoga
+# Created:      17.10.2026
+# Description:  Benchmarks of facade.py remote storage facade.
+#               Remote round-trips are simulated by small sleeps.
+#               Run: python -m benchmarks.facade_bench
+#-----------------------------------------------------------------------------#
+
+
+import time
+
+from benchmarks.common import quiet, report
+from facade import RemoteStorage, RemoteStorageFacade
+
+
+ROUND_TRIP = 0.0005
+
+
+class _SlowRemoteStorage:
+    """Adds round-trip latency to RemoteStorage and its connections.
+    """
+    def __enter__(self):
+        self._saved = (RemoteStorage.check, RemoteStorage.Connection.put,
+                       RemoteStorage.Connection.get)
+        check, put, get = self._saved
+
+        def slow(func):
+            def wrapper(*args):
+                time.sleep(ROUND_TRIP)
+                return func(*args)
+            return wrapper
+
+        RemoteStorage.check = slow(check)
+        RemoteStorage.Connection.put = slow(put)
+        RemoteStorage.Connection.get = slow(get)
+        return self
+
+    def __exit__(self, *args):
+        (RemoteStorage.check, RemoteStorage.Connection.put,
+         RemoteStorage.Connection.get) = self._saved
+
+
+def cached_checks(operations: int = 2000):
+    """Throughput of put()/get() with availability checked on every
+    call (check_ttl=0) and cached.
+    """
+    rows = []
+    with quiet(), _SlowRemoteStorage():
+        for check_ttl in (0, 0.1, 1.0):
+            facade = RemoteStorageFacade('far/far/away', check_ttl=check_ttl)
+            started = time.perf_counter()
+            for index in range(operations // 2):
+                facade.put('key', index)
+                facade.get('key')
+            elapsed = time.perf_counter() - started
+            facade.close()
+            rows.append({'check_ttl, s': check_ttl,
+                         'ops/s': int(operations / elapsed)})
+    report('Availability checks, %.1f ms round-trip:' % (ROUND_TRIP * 1000),
+           rows, ['check_ttl, s', 'ops/s'])
+
+
+if __name__ == '__main__':
+    cached_checks()
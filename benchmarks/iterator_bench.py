@@ -0,0 +1,124 @@
+#-----------------------------------------------------------------------------#
+# Name:         iterator_bench.py
+# Author:       Ryoga
+# Created:      17.10.2026
+# Description:  Benchmarks of iterator.py trees: compiled arrays vs walking
+#               raw nested dict, on trees with millions of nodes.
+#               Run: python -m benchmarks.iterator_bench [nodes ...]
+#-----------------------------------------------------------------------------#
+
+
+import gc
+import operator
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import report
+from iterator import DTree, WTree
+
+
+def build_tree(nodes: int, width: int) -> dict:
+    """Tree of "nodes" nodes, every node has up to "width" children.
+    Built level by level, without recursion.
+    """
+    root = {'0': []}
+    level = [root]
+    count = 1
+    while count < nodes:
+        new_level = []
+        for node in level:
+            children = next(iter(node.values()))
+            for _ in range(min(width, nodes - count)):
+                child = {str(count): []}
+                children.append(child)
+                new_level.append(child)
+                count += 1
+        level = new_level
+    return root
+
+
+def dict_depth_walk(element):
+    """Previous implementation: recursive walk over raw dict.
+    """
+    key, sublist = tuple(element.items())[0]
+    yield key
+    for sublist_element in sublist:
+        yield from dict_depth_walk(sublist_element)
+
+
+def dict_breadth_walk(tree):
+    """Previous implementation: level by level over raw dict.
+    """
+    level = [tree]
+    while level:
+        new_level = []
+        for element in level:
+            key, sublist = tuple(element.items())[0]
+            yield key
+            new_level.extend(sublist)
+        level = new_level
+
+
+def _iterated(tree):
+    for _ in tree:
+        pass
+    return tree
+
+
+def _timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def _retained_mb(func):
+    """Memory, still allocated after func(), in MB (with its result).
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        current = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return current / 2 ** 20, result
+
+
+def trees(sizes=(1000000, 3000000), widths=(2, 10)):
+    """Per tree: memory of raw dict and of compiled arrays,
+    compile time, depth-first and breadth-first iteration time
+    (raw dict walk vs compiled tree, first and repeated iteration).
+    """
+    rows = []
+    for nodes in sizes:
+        for width in widths:
+            dict_mb, tree = _retained_mb(lambda: build_tree(nodes, width))
+            compile_time, dtree = _timed(lambda: DTree(tree))
+            # Breadth-first order is built on first use: count it too.
+            arrays_mb, _ = _retained_mb(lambda: _iterated(WTree(tree)))
+            wtree = WTree(tree)
+            for name, old, new in (
+                    ('depth', lambda: dict_depth_walk(tree), dtree),
+                    ('breadth', lambda: dict_breadth_walk(tree), wtree)):
+                old_time, old_count = _timed(lambda: sum(1 for _ in old()))
+                new_time, new_count = _timed(lambda: sum(1 for _ in new))
+                again_time, _ = _timed(lambda: sum(1 for _ in new))
+                if not old_count == new_count == nodes:
+                    raise AssertionError('Node count mismatch.')
+                if not all(map(operator.eq, old(), new)):
+                    raise AssertionError('%s order mismatch.' % name)
+                rows.append({'nodes': nodes, 'width': width, 'order': name,
+                             'dict, MB': dict_mb, 'arrays, MB': arrays_mb,
+                             'compile, s': compile_time,
+                             'dict walk, s': old_time,
+                             'compiled, s': new_time,
+                             'again, s': again_time})
+            del tree, dtree, wtree
+    report('Trees:', rows, ['nodes', 'width', 'order', 'dict, MB',
+                            'arrays, MB', 'compile, s', 'dict walk, s',
+                            'compiled, s', 'again, s'])
+
+
+if __name__ == '__main__':
+    trees(tuple(int(q) for q in sys.argv[1:]) or (1000000, 3000000))
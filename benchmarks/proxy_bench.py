@@ -0,0 +1,95 @@
+#-----------------------------------------------------------------------------#
+# Name:         proxy_bench.py
+# Author:       Ryoga
+# Created:      17.10.2026
+# Description:  Benchmark of proxy.py caching proxies under contention.
+#               Many threads miss one hot key at the same moment:
+#               counts backend calls and p99 latency of get().
+#               Run: python -m benchmarks.proxy_bench
+#-----------------------------------------------------------------------------#
+
+
+import threading
+import time
+
+from benchmarks.common import percentile, quiet, report
+from proxy import Cache, CoalescingProxyStorage, ProxyStorage, RemoteStorage
+
+
+BACKEND_LATENCY = 0.02
+THREADS = 32
+ROUNDS = 10
+
+
+class SlowRemoteStorage(RemoteStorage):
+    """Remote storage with latency and calls counter.
+    """
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(BACKEND_LATENCY)
+        return super().get(key)
+
+    def get_many(self, keys):
+        with self._lock:
+            self.calls += 1
+        time.sleep(BACKEND_LATENCY)
+        return super().get_many(keys)
+
+
+class LockedProxyStorage(ProxyStorage):
+    """Baseline: thread-safe cache, but no coalescing of misses.
+    """
+    def __init__(self, target_storage, cache=None):
+        super().__init__(target_storage, cache)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str:
+        with self._lock:
+            data = self._cache.get(key)
+        if data is not Cache.MISSING:
+            return data
+        data = self._target_storage.get(key)
+        with self._lock:
+            self._cache.put(key, data)
+        return data
+
+
+def run(proxy_class) -> dict:
+    backend = SlowRemoteStorage()
+    backend.put('hot', 'value')
+    latencies = []
+    for _ in range(ROUNDS):
+        proxy = proxy_class(backend, Cache(ttl=60))
+        barrier = threading.Barrier(THREADS)
+
+        def worker():
+            barrier.wait()
+            started = time.perf_counter()
+            proxy.get('hot')
+            latencies.append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return {
+        'proxy': proxy_class.__name__,
+        'backend calls': backend.calls,
+        'p50, ms': percentile(latencies, 50) * 1000,
+        'p99, ms': percentile(latencies, 99) * 1000,
+    }
+
+
+if __name__ == '__main__':
+    with quiet():
+        rows = [run(LockedProxyStorage), run(CoalescingProxyStorage)]
+    report('%d threads x %d rounds, one hot key, %d ms backend:' % (
+               THREADS, ROUNDS, BACKEND_LATENCY * 1000),
+           rows, ['proxy', 'backend calls', 'p50, ms', 'p99, ms'])
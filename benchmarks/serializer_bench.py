@@ -0,0 +1,244 @@
+#-----------------------------------------------------------------------------#
+# Name:         serializer_bench.py
+# Author:       Ryoga
+# Created:      17.10.2026
+# Description:  Benchmark and conformance suite for every serializer in
+#               adapter.SERIALIZERS: round-trip check, encode/decode MB/s,
+#               output size and peak memory, on datasets of different size,
+#               nesting and Unicode content.
+#               Run: python -m benchmarks.serializer_bench [--json FILE]
+#                    [--baseline FILE] [--quick]
+#-----------------------------------------------------------------------------#
+
+
+import argparse
+import collections.abc
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from adapter import JSON_BACKEND, SERIALIZERS, get_serializer
+from benchmarks.common import per_op, report
+
+
+# Serializers, that handle lists of strings only.
+STRINGS_ONLY = {'strings', 'binary-strings'}
+
+COLUMNS = ['dataset', 'serializer', 'ok', 'bytes', 'encode, MB/s',
+           'decode, MB/s', 'encode peak, KB', 'decode peak, KB']
+
+_ALPHABETS = {
+    'ascii': 'abcdefghijklmnopqrstuvwxyz0123456789 _-',
+    'unicode': 'abcабвгдеёжзийκλμνξ中文字符日本語😀🚀ñéü ',
+}
+
+
+def _text(rnd: random.Random, alphabet: str, max_length: int) -> str:
+    return ''.join(rnd.choices(alphabet, k=rnd.randint(1, max_length)))
+
+
+def _strings(count: int, alphabet: str, seed: int = 1):
+    rnd = random.Random(seed)
+    return [_text(rnd, _ALPHABETS[alphabet], 40) for _ in range(count)]
+
+
+def _records(count: int, alphabet: str, seed: int = 1):
+    rnd = random.Random(seed)
+    return [{'id': q, 'name': _text(rnd, _ALPHABETS[alphabet], 20),
+             'score': rnd.random() * 1000, 'active': rnd.random() < 0.5,
+             'tags': [_text(rnd, _ALPHABETS[alphabet], 8)
+                      for _ in range(rnd.randint(0, 4))],
+             'parent': None if q % 3 else q - 1}
+            for q in range(count)]
+
+
+def _nested(depth: int, width: int, alphabet: str, seed: int = 1):
+    rnd = random.Random(seed)
+
+    def node(level):
+        if not level:
+            return _text(rnd, _ALPHABETS[alphabet], 12)
+        return {'name': _text(rnd, _ALPHABETS[alphabet], 12),
+                'weight': rnd.randint(-10 ** 6, 10 ** 6),
+                'children': [node(level - 1) for _ in range(width)]}
+    return node(depth)
+
+
+def _non_finite(count: int, seed: int = 1):
+    """Records with NaN and Infinity: stdlib JSON writes them, some
+    faster libraries don't.
+    """
+    rnd = random.Random(seed)
+    values = [float('nan'), float('inf'), -float('inf'), 0.0, -0.0, 1e308]
+    return [{'id': q, 'value': rnd.choice(values),
+             'values': rnd.choices(values, k=3), 'parent': None}
+            for q in range(count)]
+
+
+def datasets(quick: bool = False):
+    """{name: (kind, data)}. Kind "strings" is a list of strings
+    (any serializer), kind "json" is any JSON-like data.
+    """
+    scale = 10 if quick else 1
+    return {
+        'strings-small': ('strings', _strings(100, 'ascii')),
+        'strings-large': ('strings', _strings(100000 // scale, 'ascii')),
+        'strings-unicode': ('strings', _strings(100000 // scale, 'unicode')),
+        'records': ('json', _records(20000 // scale, 'ascii')),
+        'records-unicode': ('json', _records(20000 // scale, 'unicode')),
+        'nested': ('json', _nested(7 if quick else 8, 4, 'ascii')),
+        'nested-unicode': ('json', _nested(7 if quick else 8, 4, 'unicode')),
+        'non-finite': ('json', _non_finite(10000 // scale)),
+    }
+
+
+def _round_trip_ok(serializer, data) -> bool:
+    result = serializer.deserialize(serializer.serialize(data))
+    if (isinstance(result, collections.abc.Sequence) and
+            not isinstance(result, (str, list))):
+        result = list(result)  # Lazy sequences, like LazyStringsList.
+    return result == data or _equal(result, data)
+
+
+def _equal(left, right) -> bool:
+    """Deep equality, where NaN is equal to NaN.
+    """
+    if isinstance(left, float) and isinstance(right, float):
+        return left == right or (math.isnan(left) and math.isnan(right))
+    if isinstance(left, dict) and isinstance(right, dict):
+        return (left.keys() == right.keys() and
+                all(_equal(left[q], right[q]) for q in left))
+    if isinstance(left, list) and isinstance(right, list):
+        return (len(left) == len(right) and
+                all(map(_equal, left, right)))
+    return left == right
+
+
+def _throughput(func, size: int, budget: float) -> float:
+    """MB/s of func() over "size" bytes, func is repeated to take
+    about "budget" seconds per round.
+    """
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    repeat = max(1, int(budget / max(elapsed, 1e-9)))
+    return size / per_op(func, repeat, rounds=3) / 1e6
+
+
+def _peak_kb(func) -> float:
+    """Peak of memory, allocated by func(), in KB.
+    """
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del result
+    return (peak - base) / 1024
+
+
+def run(names=None, quick: bool = False, budget: float = 0.2):
+    """Measure every serializer on every dataset it supports.
+    Throughput is counted in bytes of serialized data.
+    """
+    rows = []
+    for dataset, (kind, data) in datasets(quick).items():
+        for name in names or SERIALIZERS:
+            if kind != 'strings' and name in STRINGS_ONLY:
+                continue
+            serializer = get_serializer(name)
+            encoded = serializer.serialize(data)
+            size = len(encoded.encode() if isinstance(encoded, str)
+                       else encoded)
+            rows.append({
+                'dataset': dataset,
+                'serializer': name,
+                'ok': _round_trip_ok(serializer, data),
+                'bytes': size,
+                'encode, MB/s': _throughput(
+                    lambda: serializer.serialize(data), size, budget),
+                'decode, MB/s': _throughput(
+                    lambda: serializer.deserialize(encoded), size, budget),
+                'encode peak, KB': _peak_kb(
+                    lambda: serializer.serialize(data)),
+                'decode peak, KB': _peak_kb(
+                    lambda: serializer.deserialize(encoded)),
+            })
+    return rows
+
+
+def regressions(rows, baseline_rows, tolerance: float):
+    """Rows, that are slower than baseline by more than "tolerance"
+    (fraction), or lost round-trip correctness.
+    """
+    baseline = {(q['dataset'], q['serializer']): q for q in baseline_rows}
+    found = []
+    for row in rows:
+        old = baseline.get((row['dataset'], row['serializer']))
+        if old is None:
+            continue
+        if old['ok'] and not row['ok']:
+            found.append((row, 'round-trip fails'))
+        for column in ('encode, MB/s', 'decode, MB/s'):
+            if row[column] < old[column] * (1 - tolerance):
+                found.append((row, '%s %.3f -> %.3f' % (
+                    column, old[column], row[column])))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark and conformance suite of serializers.')
+    parser.add_argument('--json', metavar='FILE',
+                        help='save results as JSON ("-" for stdout)')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='JSON results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed throughput drop vs baseline')
+    parser.add_argument('--serializer', action='append',
+                        choices=sorted(SERIALIZERS),
+                        help='serializer to run (default: all)')
+    parser.add_argument('--quick', action='store_true',
+                        help='10x smaller datasets')
+    options = parser.parse_args(argv)
+
+    rows = run(options.serializer, options.quick)
+    results = {'python': platform.python_version(),
+               'platform': platform.platform(),
+               'json_backend': JSON_BACKEND,
+               'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'quick': options.quick,
+               'results': rows}
+    if options.json == '-':
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        report('Serializers:', rows, COLUMNS)
+        if options.json:
+            with open(options.json, 'w') as output:
+                json.dump(results, output, indent=2)
+
+    failed = [row for row in rows if not row['ok']]
+    for row in failed:
+        print('Round-trip fails: %(serializer)s on %(dataset)s' % row,
+              file=sys.stderr)
+    found = []
+    if options.baseline:
+        with open(options.baseline) as source:
+            found = regressions(rows, json.load(source)['results'],
+                                options.tolerance)
+        for row, reason in found:
+            print('Regression: %s on %s: %s' % (
+                row['serializer'], row['dataset'], reason), file=sys.stderr)
+    return 1 if failed or found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,6 +9,16 @@
 #-----------------------------------------------------------------------------#
 
 import abc
+import atexit
+import bz2
+import collections
+import itertools
+import lzma
+import sys
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, Union
 
 
 # -------------------- INTERFACES ------------------------- #
@@ -28,14 +38,46 @@ class Storage(abc.ABC):
         """
         pass
 
+    def put_many(self, items: Dict[str, str]):
+        """Put many key-data pairs to storage.
+        Default: one put() per key, override for real batching.
+        """
+        for key, data in items.items():
+            self.put(key, data)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Get many keys from storage, as {key: data} dict.
+        Default: one get() per key, override for real batching.
+        """
+        return {key: self.get(key) for key in keys}
+
 class StorageDecorator(Storage):
     """Abstract Storage Decorator class.
+    Decorator with FUSIBLE = True only changes keys and data by pure
+    transform_*() methods, so FusedStorage can inline it.
     """
+    FUSIBLE = False
+
     def __init__(self, component: Storage):
         """Init decorator, set component's value.
         """
         self._component = component
 
+    def transform_key(self, key: str) -> str:
+        """Key, passed to component (put and get).
+        """
+        return key
+
+    def transform_put(self, data: str) -> str:
+        """Data, passed to component's put().
+        """
+        return data
+
+    def transform_get(self, data: str) -> str:
+        """Data, returned from component's get().
+        """
+        return data
+
 # ------------------ IMPLEMENTATION ----------------------- #
 
 class MemoryStorage(Storage):
@@ -50,6 +92,79 @@ class MemoryStorage(Storage):
     def get(self, key: str) -> str:
         return self._storage.get(key)
 
+    def put_many(self, items: Dict[str, str]):
+        self._storage.update(items)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        return {key: self._storage.get(key) for key in keys}
+
+
+class _Shard:
+    """Part of sharded storage: dict with own lock.
+    """
+    __slots__ = ('lock', 'data')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}
+
+
+class ShardedMemoryStorage(Storage):
+    """Thread-safe storage class, that stores data in memory.
+    Keys are spread by hash over independently locked shards, so threads
+    rarely wait for each other. If shard_size is set, the oldest
+    written keys of overflowed shard are dropped.
+    """
+    def __init__(self, shards: int = 16, shard_size: int = None):
+        self._shards = [_Shard() for _ in range(shards)]
+        self._shard_size = shard_size
+
+    def __len__(self):
+        return sum(len(shard.data) for shard in self._shards)
+
+    def put(self, key: str, data: str):
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            self._write(shard, {key: data})
+
+    def get(self, key: str) -> str:
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            return shard.data.get(key)
+
+    def put_many(self, items: Dict[str, str]):
+        groups = {}
+        for key, data in items.items():
+            groups.setdefault(hash(key) % len(self._shards), {})[key] = data
+        for index, group in groups.items():
+            shard = self._shards[index]
+            with shard.lock:
+                self._write(shard, group)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        groups = {}
+        for key in keys:
+            groups.setdefault(hash(key) % len(self._shards), []).append(key)
+        result = {}
+        for index, group in groups.items():
+            shard = self._shards[index]
+            with shard.lock:
+                for key in group:
+                    result[key] = shard.data.get(key)
+        return result
+
+    def _write(self, shard: _Shard, items: Dict[str, str]):
+        """Write items to locked shard, keep it within shard_size.
+        """
+        data = shard.data
+        for key, value in items.items():
+            # Re-insert, so dict order is the order of writes.
+            data.pop(key, None)
+            data[key] = value
+        if self._shard_size is not None:
+            while len(data) > self._shard_size:
+                del data[next(iter(data))]
+
 
 class StorageLoggerDecorator(StorageDecorator):
     """Logging decorator class, for Storage class.
@@ -64,6 +179,122 @@ class StorageLoggerDecorator(StorageDecorator):
         print(' - get "%s" key ("%s" data)' % (key, data))
         return data
 
+    def put_many(self, items: Dict[str, str]):
+        print(' - put %d keys: %s' % (len(items), ', '.join(items)))
+        return self._component.put_many(items)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        result = self._component.get_many(keys)
+        print(' - get %d keys: %s' % (len(result), ', '.join(result)))
+        return result
+
+
+class QueuedStorageLoggerDecorator(StorageDecorator):
+    """Logging decorator class, for hot paths.
+    Records are sampled (every N-th and/or not more than max_per_second),
+    formatted and written by background thread, that wakes up every
+    flush_interval seconds. If bounded queue is full, record is dropped
+    and counted in "dropped". Queued records are written at exit too.
+    """
+    def __init__(self, component: Storage, sample_every: int = 1,
+                 max_per_second: int = None, queue_size: int = 10000,
+                 flush_interval: float = 0.05, stream=None):
+        super().__init__(component)
+        self.enabled = True
+        self.dropped = 0
+        self._sample_every = sample_every
+        self._max_per_second = max_per_second
+        # next() of itertools.count is atomic: 1-in-N sampling takes no lock.
+        self._counter = itertools.count(1)
+        self._window_start = 0.0
+        self._window_count = 0
+        self._lock = threading.Lock()
+        # deque.append() and popleft() are atomic: no locks on hot path.
+        self._queue = collections.deque()
+        self._queue_size = queue_size
+        self._flush_interval = flush_interval
+        self._closed = threading.Event()
+        self._stream = stream
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def put(self, key: str, data: str):
+        if self.enabled and self._sampled():
+            self._emit(' - put "%s:%s"', key, data)
+        return self._component.put(key, data)
+
+    def get(self, key: str) -> str:
+        data = self._component.get(key)
+        if self.enabled and self._sampled():
+            self._emit(' - get "%s" key ("%s" data)', key, data)
+        return data
+
+    def put_many(self, items: Dict[str, str]):
+        if self.enabled and self._sampled():
+            self._emit(' - put %d keys: %s', len(items), _Joined(items))
+        return self._component.put_many(items)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        result = self._component.get_many(keys)
+        if self.enabled and self._sampled():
+            self._emit(' - get %d keys: %s', len(result), _Joined(result))
+        return result
+
+    def close(self):
+        """Write all queued records and stop writer thread.
+        """
+        self._closed.set()
+        self._writer.join()
+        atexit.unregister(self.close)
+
+    def _sampled(self) -> bool:
+        if (self._sample_every > 1 and
+                next(self._counter) % self._sample_every):
+            return False
+        if self._max_per_second is None:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 1:
+                self._window_start = now
+                self._window_count = 0
+            if self._window_count >= self._max_per_second:
+                return False
+            self._window_count += 1
+            return True
+
+    def _emit(self, message: str, *args):
+        """Queue record. Formatting is postponed to writer thread.
+        """
+        if len(self._queue) < self._queue_size:
+            self._queue.append((message, args))
+        else:
+            with self._lock:
+                self.dropped += 1
+
+    def _write(self):
+        while True:
+            closed = self._closed.wait(self._flush_interval)
+            stream = self._stream or sys.stdout
+            while self._queue:
+                message, args = self._queue.popleft()
+                print(message % args, file=stream)
+            if closed:
+                break
+
+
+class _Joined:
+    """Lazy ', '.join() of keys: made only if record is written.
+    """
+    __slots__ = ('_keys',)
+
+    def __init__(self, keys: Iterable[str]):
+        self._keys = tuple(keys)
+
+    def __str__(self):
+        return ', '.join(self._keys)
+
 
 class StoragePrefixDecorator(StorageDecorator):
     """Content enchncing decorator class, for Storage class.
@@ -71,21 +302,256 @@ class StoragePrefixDecorator(StorageDecorator):
     Just for demo.
     """
     PREFIX = 'prefix@'
+    FUSIBLE = True
 
     def get(self, key: str) -> str:
-        return self.PREFIX + self._component.get(key)
+        return self.transform_get(self._component.get(key))
 
     def put(self, key: str, data: str):
-        data = self._remove_prefix(data)
-        return self._component.put(key, data)
+        return self._component.put(key, self.transform_put(data))
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        result = self._component.get_many(keys)
+        return {key: self.transform_get(data) for key, data in result.items()}
 
-    @classmethod
-    def _remove_prefix(cls, data: str):
-        if data.startswith(cls.PREFIX):
+    def put_many(self, items: Dict[str, str]):
+        items = {key: self.transform_put(data) for key, data in items.items()}
+        return self._component.put_many(items)
+
+    def transform_put(self, data: str) -> str:
+        if data.startswith(self.PREFIX):
             return data.split('@', 1)[1]
         else:
             return data
 
+    def transform_get(self, data: str) -> str:
+        return self.PREFIX + data
+
+
+class StorageCompressionDecorator(StorageDecorator):
+    """Compressing decorator class, for Storage class.
+    Data (str, bytes or memoryview) is stored as bytes: flags byte +
+    payload. Payloads shorter than threshold are not compressed.
+    Binary data is returned as memoryview over stored bytes, without
+    copies. "stats" collects sizes and time spent (by put() / get() of
+    decorator itself, FusedStorage only uses pure transforms).
+    """
+    CODECS = {
+        'zlib': (lambda data, level: zlib.compress(data, level),
+                 zlib.decompress, 6),
+        'lzma': (lambda data, level: lzma.compress(data, preset=level),
+                 lzma.decompress, 6),
+        'bz2': (lambda data, level: bz2.compress(data, level),
+                bz2.decompress, 9),
+    }
+    COMPRESSED = 1
+    TEXT = 2
+    FUSIBLE = True
+
+    def __init__(self, component: Storage, codec: str = 'zlib',
+                 level: int = None, threshold: int = 256):
+        super().__init__(component)
+        if codec not in self.CODECS:
+            raise ValueError('Unknown codec "%s".' % codec)
+        self._compress, self._decompress, default_level = self.CODECS[codec]
+        self._level = default_level if level is None else level
+        self._threshold = threshold
+        self.stats = {'puts': 0, 'gets': 0, 'raw_bytes': 0,
+                      'stored_bytes': 0, 'compress_time': 0.0,
+                      'decompress_time': 0.0}
+
+    @property
+    def ratio(self) -> float:
+        """Stored / raw bytes, for all put() calls.
+        """
+        if not self.stats['raw_bytes']:
+            return 1.0
+        return self.stats['stored_bytes'] / self.stats['raw_bytes']
+
+    def put(self, key: str, data: Union[str, bytes, memoryview]):
+        return self._component.put(key, self._counted_put(data))
+
+    def get(self, key: str) -> Union[str, memoryview]:
+        return self._counted_get(self._component.get(key))
+
+    def put_many(self, items: Dict[str, str]):
+        items = {key: self._counted_put(data) for key, data in items.items()}
+        return self._component.put_many(items)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        result = self._component.get_many(keys)
+        return {key: self._counted_get(data) for key, data in result.items()}
+
+    def transform_put(self, data: Union[str, bytes, memoryview]) -> bytes:
+        return self._encode(data)[0]
+
+    def transform_get(self, data: bytes) -> Union[str, memoryview]:
+        return self._decode(data)[0]
+
+    def _counted_put(self, data: Union[str, bytes, memoryview]) -> bytes:
+        """transform_put() + stats. Fused stacks don't update stats:
+        transforms must be pure.
+        """
+        stored, raw_length, elapsed = self._encode(data)
+        stats = self.stats
+        stats['puts'] += 1
+        stats['raw_bytes'] += raw_length
+        stats['stored_bytes'] += len(stored)
+        stats['compress_time'] += elapsed
+        return stored
+
+    def _counted_get(self, data: bytes) -> Union[str, memoryview]:
+        if data is None:
+            return None
+        result, elapsed = self._decode(data)
+        self.stats['gets'] += 1
+        self.stats['decompress_time'] += elapsed
+        return result
+
+    def _encode(self, data: Union[str, bytes, memoryview]):
+        """(stored bytes, raw length, compression time). Payload is
+        copied once: to prepend flags byte to it.
+        """
+        flags = 0
+        if isinstance(data, str):
+            flags, data = self.TEXT, data.encode()
+        else:
+            data = memoryview(data).cast('B')  # len() in bytes, not items.
+        raw_length = len(data)
+        elapsed = 0.0
+        if raw_length >= self._threshold:
+            started = time.perf_counter()
+            compressed = self._compress(data, self._level)
+            elapsed = time.perf_counter() - started
+            if len(compressed) < raw_length:
+                flags, data = flags | self.COMPRESSED, compressed
+        return b''.join((bytes((flags,)), data)), raw_length, elapsed
+
+    def _decode(self, data: bytes):
+        """(data, decompression time).
+        """
+        if data is None:
+            return None, 0.0
+        view = memoryview(data)
+        flags, payload = view[0], view[1:]
+        elapsed = 0.0
+        if flags & self.COMPRESSED:
+            started = time.perf_counter()
+            payload = self._decompress(payload)
+            elapsed = time.perf_counter() - started
+        if flags & self.TEXT:
+            return str(payload, 'utf-8'), elapsed
+        return memoryview(payload), elapsed
+
+
+# ------------------------- FUSION -------------------------- #
+
+def _nest(names, value: str) -> str:
+    """Source of straight nested calls: n2(n1(n0(value))).
+    """
+    for name in names:
+        value = '%s(%s)' % (name, value)
+    return value
+
+
+def _generate(params: str, body: str, **funcs):
+    """Function "lambda params: body", generated once as source code,
+    so any depth of nested calls costs a single Python frame.
+    """
+    namespace = dict(funcs)
+    exec('def generated(%s):\n    return %s\n' % (params, body), namespace)
+    return namespace['generated']
+
+
+def _compose(funcs):
+    """One function, applying funcs in order (None if no funcs):
+    f2(f1(f0(value))), without wrapper frame per function.
+    """
+    if not funcs:
+        return None
+    if len(funcs) == 1:
+        return funcs[0]
+    names = ['f%d' % index for index in range(len(funcs))]
+    return _generate('value', _nest(names, 'value'),
+                     **dict(zip(names, funcs)))
+
+
+def _same(value):
+    return value
+
+
+def _overrides(layer: StorageDecorator, name: str) -> bool:
+    return getattr(type(layer), name) is not getattr(StorageDecorator, name)
+
+
+class FusedStorage:
+    """Decorators stack, compiled once to flat put() and get() functions.
+    FUSIBLE layers from the top of the stack are inlined as transforms;
+    the first not fusible layer (or the storage itself) is called as is,
+    so it delegates further in usual way.
+    Stack must not be changed after fusion.
+    put() and get() are instance attributes (no extra call per
+    operation), so the class is registered as Storage, not inherited.
+    """
+    def __init__(self, storage: Storage):
+        keys, puts, gets = [], [], []
+        layer = storage
+        while isinstance(layer, StorageDecorator) and layer.FUSIBLE:
+            if _overrides(layer, 'transform_key'):
+                keys.append(layer.transform_key)
+            if _overrides(layer, 'transform_put'):
+                puts.append(layer.transform_put)
+            if _overrides(layer, 'transform_get'):
+                gets.append(layer.transform_get)
+            layer = layer._component
+        self._target = layer
+        self._key = _compose(keys)
+        self._put_data = _compose(puts)
+        self._get_data = _compose(gets[::-1])
+        self.put = self._compile_put(keys, puts)
+        self.get = self._compile_get(keys, gets[::-1])
+
+    def put_many(self, items: Dict[str, str]):
+        key, put_data = self._key or _same, self._put_data or _same
+        return self._target.put_many(
+            {key(name): put_data(data) for name, data in items.items()})
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        key, get_data = self._key or _same, self._get_data or _same
+        names = {key(name): name for name in keys}
+        result = self._target.get_many(names)
+        return {names[q]: get_data(data) for q, data in result.items()}
+
+    def _compile_put(self, keys, puts):
+        """target(k1(k0(name)), p1(p0(data))) as one function.
+        """
+        if not keys and not puts:
+            return self._target.put
+        funcs = dict(target=self._target.put)
+        funcs.update(('k%d' % index, func) for index, func in enumerate(keys))
+        funcs.update(('p%d' % index, func) for index, func in enumerate(puts))
+        return _generate('name, data', 'target(%s, %s)' % (
+            _nest(['k%d' % index for index in range(len(keys))], 'name'),
+            _nest(['p%d' % index for index in range(len(puts))], 'data')),
+            **funcs)
+
+    def _compile_get(self, keys, gets):
+        """g1(g0(target(k1(k0(name))))) as one function.
+        """
+        if not keys and not gets:
+            return self._target.get
+        funcs = dict(target=self._target.get)
+        funcs.update(('k%d' % index, func) for index, func in enumerate(keys))
+        funcs.update(('g%d' % index, func) for index, func in enumerate(gets))
+        key = _nest(['k%d' % index for index in range(len(keys))], 'name')
+        return _generate('name', _nest(
+            ['g%d' % index for index in range(len(gets))],
+            'target(%s)' % key), **funcs)
+
+
+Storage.register(FusedStorage)
+
+
 # ------------------------- TEST --------------------------- #
 
 if __name__ == '__main__':
@@ -95,4 +561,26 @@ if __name__ == '__main__':
     decorator = StoragePrefixDecorator(decorator)
     decorator.put('some_key', 'some_value')
     print('Got:', decorator.get('some_key'))
+    decorator.put_many({'key_1': 'prefix@value_1', 'key_2': 'value_2'})
+    print('Got:', decorator.get_many(['key_1', 'key_2']))
+
+    print('\nQueued sampled logging test:')
+    logger = QueuedStorageLoggerDecorator(storage, sample_every=2)
+    for index in range(4):
+        logger.put('key_%d' % index, 'value_%d' % index)
+    logger.close()
+
+    print('\nFused decorators test:')
+    fused = FusedStorage(StoragePrefixDecorator(StoragePrefixDecorator(
+        StorageLoggerDecorator(storage))))
+    fused.put('some_key', 'prefix@some_value')
+    print('Got:', fused.get('some_key'))
+
+    print('\nCompression test:')
+    compressor = StorageCompressionDecorator(storage, codec='lzma')
+    compressor.put('text_key', 'some_value ' * 100)
+    compressor.put('binary_key', bytes(range(256)) * 10)
+    print('Got: %d chars, %d bytes, stored/raw ratio: %.3f' % (
+          len(compressor.get('text_key')), len(compressor.get('binary_key')),
+          compressor.ratio))
 
@@ -7,7 +7,12 @@
 #-----------------------------------------------------------------------------#
 
 
+import collections
+import contextlib
+import threading
+import time
 from enum import Enum
+from typing import Dict, Iterable, Tuple
 
 
 class RemoteStorage:
@@ -23,10 +28,11 @@ class RemoteStorage:
     class Connection:
         """Storage connection object.
         """
-        def __init__(self, address):
+        def __init__(self, address, storage: dict):
             """Storing in memory - just for testing.
             """
-            self._storage = {}
+            self._storage = storage
+            self._closed = False
             print(' - connected to "%s".' % address)
 
         def put(self, key: str, data: str):
@@ -41,21 +47,64 @@ class RemoteStorage:
             print(' - get "%s" from remote storage.' % key)
             return self._storage.get(key)
 
+        def put_many(self, items: Dict[str, str]) -> Dict[str, Exception]:
+            """Pipelined put: all items in one round-trip.
+            Returns errors of failed keys.
+            """
+            print(' - put %d keys to remote storage.' % len(items))
+            errors = {}
+            for key, data in items.items():
+                if isinstance(key, str):
+                    self._storage[key] = data
+                else:
+                    errors[key] = TypeError('Key must be str.')
+            return errors
+
+        def get_many(self, keys: Iterable[str]
+                     ) -> Tuple[Dict[str, str], Dict[str, Exception]]:
+            """Pipelined get: all keys in one round-trip.
+            Returns data of found keys and errors of failed ones.
+            """
+            keys = list(keys)
+            print(' - get %d keys from remote storage.' % len(keys))
+            values, errors = {}, {}
+            for key in keys:
+                if isinstance(key, str):
+                    values[key] = self._storage.get(key)
+                else:
+                    errors[key] = TypeError('Key must be str.')
+            return values, errors
+
+        def ping(self) -> bool:
+            """Check, that connection is still alive.
+            """
+            return not self._closed
+
         def close(self) -> str:
             """Disconnect from remote storage.
             """
+            self._closed = True
             print(' - disconnected.')
 
     def __init__(self):
         self._connections_pool = {}
+        self._remote_data = collections.defaultdict(dict)
+        self._lock = threading.Lock()
 
     def connect(self, address) -> 'RemoteStorage.Connection':
-        """connect to storage.
+        """connect to storage (new connection, not pooled).
+        """
+        return RemoteStorage.Connection(address, self._remote_data[address])
+
+    def pool(self, address, **options) -> 'ConnectionPool':
+        """Connections pool for address, created on first call
+        (options are ConnectionPool's arguments).
         """
-        if address in self._connections_pool:
+        with self._lock:
+            if address not in self._connections_pool:
+                self._connections_pool[address] = ConnectionPool(
+                    lambda: self.connect(address), **options)
             return self._connections_pool[address]
-        else:
-            return RemoteStorage.Connection(address)
 
     def check(self, address) -> State:
         """Check remote storage state.
@@ -64,35 +113,363 @@ class RemoteStorage:
         return RemoteStorage.State.AVAILABLE
 
 
+class ConnectionPool:
+    """Bounded thread-safe pool of connections to one address.
+    Idle connections are reused (last released first), closed after
+    idle_timeout seconds and health-checked by ping() on checkout.
+    If all max_size connections are busy, acquire() waits up to
+    checkout_timeout seconds.
+    """
+    class ExhaustedError(Exception):
+        pass
+
+    def __init__(self, connect, max_size: int = 4, idle_timeout: float = 60,
+                 checkout_timeout: float = 5):
+        self._connect = connect
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._checkout_timeout = checkout_timeout
+        self._idle = collections.deque()
+        self._size = 0
+        self._condition = threading.Condition()
+        self.stats = {'hits': 0, 'created': 0, 'closed': 0, 'waits': 0,
+                      'wait_time': 0.0}
+
+    def acquire(self, timeout: float = None) -> RemoteStorage.Connection:
+        """Get connection from pool, or create new one if pool is not full.
+        Candidates are taken under the lock, but pinged and closed
+        outside of it: other threads don't wait for round-trips.
+        """
+        if timeout is None:
+            timeout = self._checkout_timeout
+        started = time.monotonic()
+        waited = False
+        while True:
+            stale, connection = [], None
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    while (self._idle and
+                           now - self._idle[0][1] > self._idle_timeout):
+                        stale.append(self._forget(self._idle.popleft()[0]))
+                    if self._idle:
+                        connection = self._idle.pop()[0]
+                        break
+                    if self._size < self._max_size:
+                        self._size += 1
+                        break
+                    remaining = started + timeout - now
+                    if remaining <= 0:
+                        self._count_wait(waited, started)
+                        raise self.ExhaustedError
+                    waited = True
+                    self._condition.wait(remaining)
+            for expired in stale:
+                expired.close()
+            if connection is None:
+                break
+            if connection.ping():
+                with self._condition:
+                    self.stats['hits'] += 1
+                    self._count_wait(waited, started)
+                return connection
+            self.discard(connection)
+        try:
+            connection = self._connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self.stats['created'] += 1
+            self._count_wait(waited, started)
+        return connection
+
+    def release(self, connection: RemoteStorage.Connection):
+        """Return connection to pool.
+        """
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def discard(self, connection: RemoteStorage.Connection):
+        """Close broken connection instead of returning it to pool.
+        """
+        with self._condition:
+            self._forget(connection)
+        connection.close()
+
+    @contextlib.contextmanager
+    def connection(self, timeout: float = None):
+        """Borrowed connection, for "with" statement.
+        """
+        connection = self.acquire(timeout)
+        broken = True
+        try:
+            yield connection
+            broken = False
+        finally:
+            # Any exception (KeyboardInterrupt too) may leave connection
+            # in unknown state.
+            if broken:
+                self.discard(connection)
+            else:
+                self.release(connection)
+
+    def close(self):
+        """Close all idle connections.
+        """
+        with self._condition:
+            idle = [self._forget(q) for q, _ in self._idle]
+            self._idle.clear()
+        for connection in idle:
+            connection.close()
+
+    def _forget(self, connection: RemoteStorage.Connection):
+        """Count out connection, that is not in idle deque any more.
+        Returned connection is to be closed outside the lock.
+        """
+        self._size -= 1
+        self.stats['closed'] += 1
+        self._condition.notify()
+        return connection
+
+    def _count_wait(self, waited: bool, started: float):
+        if waited:
+            self.stats['waits'] += 1
+            self.stats['wait_time'] += time.monotonic() - started
+
+
+class CircuitBreaker:
+    """Guard for calls to remote storage.
+    CLOSED: calls pass; availability check is cached for check_ttl
+        seconds; failed check or failure_threshold failed calls in a row
+        open the circuit.
+    OPEN: calls fail fast; background thread probes availability every
+        probe_interval seconds and moves circuit to HALF_OPEN.
+    HALF_OPEN: one trial call passes, others fail fast; its success
+        closes circuit, failure opens it. Caller of allow() must report
+        success(), failure() or release() (call was not done).
+    """
+    class State(Enum):
+        CLOSED = 1
+        OPEN = 2
+        HALF_OPEN = 3
+
+    def __init__(self, check, check_ttl: float = 1.0,
+                 failure_threshold: int = 3, probe_interval: float = 1.0):
+        self._check = check
+        self._check_ttl = check_ttl
+        self._failure_threshold = failure_threshold
+        self._probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._state = CircuitBreaker.State.CLOSED
+        self._checked_at = None
+        self._failures = 0
+        self._prober = None
+        self._trial = False
+
+    @property
+    def state(self) -> State:
+        return self._state
+
+    def allow(self) -> bool:
+        """May the call be done now?
+        """
+        with self._lock:
+            if self._state == CircuitBreaker.State.OPEN:
+                return False
+            if self._state == CircuitBreaker.State.HALF_OPEN:
+                if self._trial:
+                    return False
+                self._trial = True
+                return True
+            now = time.monotonic()
+            if (self._checked_at is not None and
+                    now - self._checked_at < self._check_ttl):
+                return True
+            # Other threads use this result while check is in progress.
+            self._checked_at = now
+        try:
+            available = self._check()
+        except Exception:
+            available = False
+        if available:
+            return True
+        with self._lock:
+            self._open()
+        return False
+
+    def success(self):
+        with self._lock:
+            self._failures = 0
+            if self._state == CircuitBreaker.State.HALF_OPEN:
+                self._state = CircuitBreaker.State.CLOSED
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self._failures += 1
+            if (self._state == CircuitBreaker.State.HALF_OPEN or
+                    self._failures >= self._failure_threshold):
+                self._open()
+
+    def release(self):
+        """Allowed call was not done: let next trial call pass.
+        """
+        with self._lock:
+            self._trial = False
+
+    def _open(self):
+        """Open circuit and start prober. Lock must be held.
+        """
+        self._state = CircuitBreaker.State.OPEN
+        self._failures = 0
+        self._trial = False
+        if self._prober is None or not self._prober.is_alive():
+            self._prober = threading.Thread(target=self._probe, daemon=True)
+            self._prober.start()
+
+    def _probe(self):
+        while True:
+            time.sleep(self._probe_interval)
+            try:
+                available = self._check()
+            except Exception:
+                available = False
+            if available:
+                with self._lock:
+                    self._state = CircuitBreaker.State.HALF_OPEN
+                    self._checked_at = time.monotonic()
+                    # Failure of trial call may open circuit before this
+                    # thread ends: it must start new prober.
+                    self._prober = None
+                return
+
+
+class BatchResult:
+    """Result of facade's batch operation.
+    values: {key: data} of succeeded keys (data is None for put_many()),
+    errors: {key: exception} of failed keys.
+    """
+    def __init__(self):
+        self.values = {}
+        self.errors = {}
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
 class RemoteStorageFacade:
     """Simple facade for class RemoteStorage. Can be used in 95% situations.
-    Only constructor, put() and get() methods.
+    Only constructor, put() and get() methods (and their batch versions).
     """
+    CHUNK_SIZE = 100
+
     class NotAvailableError(Exception):
         pass
 
-    def __init__(self, address):
+    def __init__(self, address, pool_size: int = 4, idle_timeout: float = 60,
+                 checkout_timeout: float = 5, check_ttl: float = 1.0,
+                 failure_threshold: int = 3, probe_interval: float = 1.0):
         self._remote_storage = RemoteStorage()
         self._address = address
+        self._pool = self._remote_storage.pool(
+            address, max_size=pool_size, idle_timeout=idle_timeout,
+            checkout_timeout=checkout_timeout)
+        self._breaker = CircuitBreaker(
+            self._is_available, check_ttl=check_ttl,
+            failure_threshold=failure_threshold,
+            probe_interval=probe_interval)
+
+    @property
+    def pool_stats(self) -> dict:
+        return dict(self._pool.stats)
+
+    @property
+    def circuit_state(self) -> CircuitBreaker.State:
+        return self._breaker.state
 
     def put(self, key: str, data: str):
-        self._check_remote_storage()
-        connection = self._remote_storage.connect(self._address)
-        connection.put('key', 'vaue')
-        connection.close()
+        with self._connection() as connection:
+            connection.put(key, data)
 
     def get(self, key: str) -> str:
-        self._check_remote_storage()
-        connection = self._remote_storage.connect(self._address)
-        result = connection.get('key')
-        connection.close()
+        with self._connection() as connection:
+            return connection.get(key)
+
+    def put_many(self, items: Dict[str, str],
+                 chunk_size: int = None) -> BatchResult:
+        """Put items over one connection, chunk_size keys per round-trip.
+        """
+        def send(connection, chunk):
+            errors = connection.put_many({key: items[key] for key in chunk})
+            return {key: None for key in chunk if key not in errors}, errors
+        return self._pipeline(list(items), chunk_size, send)
+
+    def get_many(self, keys: Iterable[str],
+                 chunk_size: int = None) -> BatchResult:
+        """Get keys over one connection, chunk_size keys per round-trip.
+        """
+        return self._pipeline(list(keys), chunk_size,
+                              lambda connection, chunk:
+                                  connection.get_many(chunk))
+
+    def close(self):
+        """Close pooled connections.
+        """
+        self._pool.close()
+
+    def _pipeline(self, keys: list, chunk_size: int, send) -> BatchResult:
+        """Send keys by chunks. If connection fails, all keys without
+        result get its error.
+        """
+        chunk_size = chunk_size or self.CHUNK_SIZE
+        result = BatchResult()
+        try:
+            with self._connection() as connection:
+                for start in range(0, len(keys), chunk_size):
+                    values, errors = send(connection,
+                                          keys[start:start + chunk_size])
+                    result.values.update(values)
+                    result.errors.update(errors)
+        except self.NotAvailableError:
+            raise
+        except Exception as error:
+            for key in keys:
+                if key not in result.values and key not in result.errors:
+                    result.errors[key] = error
         return result
 
+    @contextlib.contextmanager
+    def _connection(self):
+        """Pooled connection, guarded by circuit breaker.
+        """
+        self._check_remote_storage()
+        reported = False
+        try:
+            with self._pool.connection() as connection:
+                try:
+                    yield connection
+                except Exception:
+                    reported = True
+                    self._breaker.failure()
+                    raise
+                reported = True
+                self._breaker.success()
+        finally:
+            if not reported:
+                self._breaker.release()
+
     def _check_remote_storage(self):
-        state = self._remote_storage.check(self._address)
-        if state != RemoteStorage.State.AVAILABLE:
+        if not self._breaker.allow():
             raise self.NotAvailableError
 
+    def _is_available(self) -> bool:
+        state = self._remote_storage.check(self._address)
+        return state == RemoteStorage.State.AVAILABLE
 
 
 # --------------------------- TEST --------------------------------
@@ -100,6 +477,11 @@ class RemoteStorageFacade:
 if __name__ == '__main__':
     rs = RemoteStorageFacade('far/far/away')
     rs.put('some_key', 'some_value')
-    rs.get('some_key')
+    print('Got:', rs.get('some_key'))
+    rs.put_many({'key_%d' % q: q for q in range(5)}, chunk_size=2)
+    batch = rs.get_many(['key_0', 'key_4', 7])
+    print('Got:', batch.values, 'errors:', batch.errors)
+    rs.close()
+    print('Pool:', rs.pool_stats)
 
 
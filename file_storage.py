@@ -0,0 +1,256 @@
+#-----------------------------------------------------------------------------#
+# Name:         file_storage.py
+# Author:       Ryoga
+# Created:      17.10.2026
+# Description:  Persistent Storage, for decorator.py and proxy.py stacks.
+#               Append-only log file + in-memory index {key: offset}.
+#               Reads are served from mmap of the log, index is restored
+#               from snapshot file on start, garbage (overwritten records)
+#               is removed by compaction in background thread.
+#-----------------------------------------------------------------------------#
+
+import marshal
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterable
+
+import proxy
+from decorator import Storage
+
+
+class FileStorage(Storage):
+    """Storage class, that stores data in append-only log file.
+    Record: header (flag, key length, data length), key, data.
+    Data may be str or bytes-like. get() returns str for str data and
+    memoryview of mmap (zero-copy) for binary data.
+    """
+    HEADER = struct.Struct('<BII')
+    STR = 0
+    BYTES = 1
+
+    def __init__(self, path: str, compact_min_bytes: int = 1 << 20):
+        self._path = path
+        self._snapshot_path = path + '.index'
+        self._compact_min_bytes = compact_min_bytes
+        self._lock = threading.RLock()
+        self._compactor = None
+        self._open()
+
+    def __len__(self):
+        return len(self._index)
+
+    def put(self, key: str, data: str):
+        self.put_many({key: data})
+
+    def get(self, key: str) -> str:
+        view, flag = self._view(key)
+        if view is None or flag == self.BYTES:
+            return view
+        return str(view, 'utf-8')
+
+    def put_many(self, items: Dict[str, str]):
+        chunks = []
+        with self._lock:
+            position = self._size
+            for key, data in items.items():
+                key_bytes = key.encode()
+                if isinstance(data, str):
+                    flag, data = self.STR, data.encode()
+                else:
+                    flag, data = self.BYTES, memoryview(data).cast('B')
+                chunks.extend((self.HEADER.pack(flag, len(key_bytes),
+                                                len(data)), key_bytes, data))
+                position += self.HEADER.size + len(key_bytes)
+                self._set_entry(key, (position, len(data), flag))
+                position += len(data)
+            self._file.write(b''.join(chunks))
+            self._size = position
+            self._maybe_compact()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        return {key: self.get(key) for key in keys}
+
+    def get_view(self, key: str) -> memoryview:
+        """Zero-copy view of stored data (None if key is absent).
+        """
+        return self._view(key)[0]
+
+    def compact(self):
+        """Rewrite log with live records only. Writers are blocked only
+        while records, appended during compaction, are copied.
+        """
+        with self._lock:
+            end = self._size
+            index = dict(self._index)
+            source = self._mapped(end)
+        temp_path = self._path + '.compact'
+        new_index = {}
+        with open(temp_path, 'wb') as output:
+            position = 0
+            for key, (offset, length, flag) in index.items():
+                start = offset - len(key.encode()) - self.HEADER.size
+                output.write(source[start:offset + length])
+                new_index[key] = (position + offset - start, length, flag)
+                position += offset + length - start
+            with self._lock:
+                dead = 0
+                source = self._mapped(self._size)
+                for key, offset, length, flag, _ in self._records(
+                        source, end, self._size):
+                    if key in new_index:
+                        dead += self._record_size(key, new_index[key])
+                    new_index[key] = (position + offset - end, length, flag)
+                output.write(source[end:self._size])
+                output.flush()
+                os.fsync(output.fileno())
+                self._close_files()
+                os.replace(temp_path, self._path)
+                self._open(new_index, dead)
+                self.save_snapshot()
+
+    def save_snapshot(self):
+        """Save index to snapshot file, for fast start.
+        """
+        with self._lock:
+            snapshot = (os.fstat(self._file.fileno()).st_ino, self._size,
+                        self._dead, self._index)
+            temp_path = self._snapshot_path + '.tmp'
+            with open(temp_path, 'wb') as output:
+                marshal.dump(snapshot, output)
+            os.replace(temp_path, self._snapshot_path)
+
+    def close(self):
+        """Wait for compaction, save snapshot, close files.
+        """
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            self.save_snapshot()
+            self._close_files()
+
+    def _open(self, index: dict = None, dead: int = 0):
+        """Open log file. Index is given, or loaded from snapshot and
+        log records after it. Torn record at the end is cut off.
+        """
+        self._file = open(self._path, 'ab+', buffering=0)
+        self._size = os.fstat(self._file.fileno()).st_size
+        self._map = None
+        if index is None:
+            index, dead, start = self._load_snapshot()
+            end = start
+            source = self._mapped(self._size)
+            for key, offset, length, flag, end in self._records(
+                    source, start, self._size):
+                if key in index:
+                    dead += self._record_size(key, index[key])
+                index[key] = (offset, length, flag)
+            if end < self._size:
+                self._file.truncate(end)
+                self._size = end
+                self._map = None
+        self._index = index
+        self._dead = dead
+
+    def _load_snapshot(self):
+        """Get (index, dead bytes, log position) from snapshot file,
+        if it matches current log file.
+        """
+        try:
+            with open(self._snapshot_path, 'rb') as snapshot:
+                inode, size, dead, index = marshal.load(snapshot)
+        except (OSError, EOFError, ValueError, TypeError):
+            return {}, 0, 0
+        stat = os.fstat(self._file.fileno())
+        if inode != stat.st_ino or size > self._size:
+            return {}, 0, 0
+        return index, dead, size
+
+    def _records(self, source, start: int, end: int):
+        """Generator of (key, data offset, data length, flag, record end)
+        for complete records in source[start:end].
+        """
+        header_size = self.HEADER.size
+        position = start
+        while position + header_size <= end:
+            flag, key_length, length = self.HEADER.unpack_from(source,
+                                                               position)
+            offset = position + header_size + key_length
+            if offset + length > end:
+                return
+            key = str(source[position + header_size:offset], 'utf-8')
+            position = offset + length
+            yield key, offset, length, flag, position
+
+    def _view(self, key: str):
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None, None
+            offset, length, flag = entry
+            source = self._mapped(offset + length)
+        return memoryview(source)[offset:offset + length], flag
+
+    def _mapped(self, end: int):
+        """Current mmap of log, remapped if it is shorter than "end".
+        Old mmap is not closed: it is freed with the last view of it.
+        """
+        if self._map is None or len(self._map) < end:
+            if not self._size:
+                return b''
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        return self._map
+
+    def _set_entry(self, key: str, entry: tuple):
+        old_entry = self._index.get(key)
+        if old_entry is not None:
+            self._dead += self._record_size(key, old_entry)
+        self._index[key] = entry
+
+    def _record_size(self, key: str, entry: tuple) -> int:
+        return self.HEADER.size + len(key.encode()) + entry[1]
+
+    def _maybe_compact(self):
+        if (self._dead > self._compact_min_bytes and
+                self._dead > self._size // 2 and
+                (self._compactor is None or
+                 not self._compactor.is_alive())):
+            self._compactor = threading.Thread(target=self.compact,
+                                               daemon=True)
+            self._compactor.start()
+
+    def _close_files(self):
+        self._map = None
+        self._file.close()
+
+
+# Same interface: can be wrapped with proxy.ProxyStorage too.
+proxy.Storage.register(FileStorage)
+
+
+# ------------------------- TEST --------------------------- #
+
+if __name__ == '__main__':
+    import tempfile
+    from decorator import StorageLoggerDecorator
+
+    path = os.path.join(tempfile.mkdtemp(), 'storage.log')
+    print('File storage test:')
+    storage = FileStorage(path)
+    decorator = StorageLoggerDecorator(storage)
+    decorator.put('some_key', 'some_value')
+    decorator.put('binary_key', b'\x00\x01\x02')
+    decorator.put('some_key', 'new_value')
+    storage.close()
+
+    print('Reopened:')
+    storage = FileStorage(path)
+    cached = proxy.ProxyStorage(storage)
+    print('Got:', cached.get('some_key'), bytes(cached.get('binary_key')))
+    storage.compact()
+    print('Compacted to %d bytes.' % os.path.getsize(path))
+    print('Got:', storage.get('some_key'))
+    storage.close()
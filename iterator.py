@@ -11,6 +11,7 @@
 
 
 import abc
+import array
 
 
 # -------------------- INTERFACES ------------------------- #
@@ -48,24 +49,69 @@ class Collection(abc.ABC):
 class Tree(Collection, abc.ABC):
     """Tree abstract class.
     Particular iterator chosen in factory method "__iter__()".
+    Input tree ({key: [subtree, ...]}) is compiled once to flat arrays
+    of node indexes, nodes are numbered in depth-first order:
+    keys, first child and next sibling (-1 if none).
+    Breadth-first order is built from children links on first
+    breadth-first walk, and kept for next ones.
     """
     def __init__(self, tree: dict):
-        self._tree = tree
-        self._check_integrity()
+        self._check_integrity(tree)
+
+    def __len__(self):
+        return len(self._keys)
 
     @abc.abstractmethod
     def __iter__(self):
         pass
 
-    def _check_integrity(self):
-        """Checks integrity of input value.
+    def _check_integrity(self, tree: dict):
+        """Checks integrity of input value, while compiling it.
         """
         try:
-            for q in self:
-                pass
+            self._compile(tree)
         except TreeIntegrityError:
             raise ValueError('Invalid "tree" parameter.')
 
+    def _compile(self, tree: dict):
+        """Build flat arrays from tree. Not recursive: depth of tree
+        is not limited by recursion limit.
+        """
+        self._keys = keys = []
+        self._first_child = first_child = array.array('i')
+        self._next_sibling = next_sibling = array.array('i')
+        self._breadth = None
+
+        def add(element):
+            if not isinstance(element, dict) or len(element) != 1:
+                raise TreeIntegrityError
+            (key, sublist), = element.items()
+            if not isinstance(sublist, list):
+                raise TreeIntegrityError
+            keys.append(key)
+            first_child.append(-1)
+            next_sibling.append(-1)
+            return sublist
+
+        # Stack frames: [children iterator, parent index, last child index].
+        stack = [[iter(add(tree)), 0, -1]]
+        while stack:
+            frame = stack[-1]
+            for element in frame[0]:
+                break
+            else:
+                stack.pop()
+                continue
+            index = len(keys)
+            sublist = add(element)
+            if frame[2] < 0:
+                first_child[frame[1]] = index
+            else:
+                next_sibling[frame[2]] = index
+            frame[2] = index
+            if sublist:
+                stack.append([iter(sublist), index, -1])
+
 
 # -------------------- PARTICULAR CLASSES ------------------------- #
 
@@ -78,21 +124,14 @@ class TreeDepthIterator(Iterable):
 
     def __next__(self):
         if not self._cursor:
-            self._cursor = self._walk(self._collection)
+            self._cursor = self._walk()
         return next(self._cursor)
 
-    def _walk(self, element):
-        """Generator. Recursive algorithm of "Depth-first iteration".
+    def _walk(self):
+        """Generator. Nodes are compiled in depth-first order,
+        so it is just a loop over keys array.
         """
-        if not isinstance(element, dict) or len(element) != 1:
-            raise TreeIntegrityError
-        key, sublist = tuple(element.items())[0]
-        if not isinstance(sublist, list):
-            raise TreeIntegrityError
-        yield key
-        for sublist_element in sublist:
-            for recursive_elem in self._walk(sublist_element):
-                yield recursive_elem
+        yield from self._collection._keys
 
 
 class TreeBreadthIterator(Iterable):
@@ -100,43 +139,48 @@ class TreeBreadthIterator(Iterable):
     """
     def __init__(self, collection: Tree):
         self._collection = collection
-        self._slice = None
         self._cursor = None
 
     def __next__(self):
         if not self._cursor:
-            self._slice = [self._collection]
             self._cursor = self._walk()
         return next(self._cursor)
 
     def _walk(self):
-        """Generator. Algorithm of "Breadth-first iteration".
+        """Generator. Loop over breadth-first order of tree. First walk
+        builds it in linear time: the order array is also the queue.
         """
-        while self._slice:
-            new_slice = []
-            for element in self._slice:
-                if not isinstance(element, dict) or len(element) != 1:
-                    raise TreeIntegrityError
-                key, sublist = tuple(element.items())[0]
-                if not isinstance(sublist, list):
-                    raise TreeIntegrityError
-                yield key
-                new_slice.extend(sublist)
-            self._slice = new_slice
+        tree = self._collection
+        keys = tree._keys
+        if tree._breadth is not None:
+            yield from map(keys.__getitem__, tree._breadth)
+            return
+        first_child = tree._first_child
+        next_sibling = tree._next_sibling
+        order = array.array('i', bytes(first_child.itemsize * len(keys)))
+        tail = 1
+        for index in order:
+            yield keys[index]
+            child = first_child[index]
+            while child >= 0:
+                order[tail] = child
+                tail += 1
+                child = next_sibling[child]
+        tree._breadth = order
 
 
 class DTree(Tree):
     """Realization of tree with "deep iteration".
     """
     def __iter__(self):
-        return TreeDepthIterator(self._tree)
+        return TreeDepthIterator(self)
 
 
 class WTree(Tree):
     """Realization of tree with "deep iteration".
     """
     def __iter__(self):
-        return TreeBreadthIterator(self._tree)
+        return TreeBreadthIterator(self)
 
 
 # --------------------------- TEST --------------------------------#
@@ -9,7 +9,12 @@
 #-----------------------------------------------------------------------------#
 
 import abc
+import atexit
+import collections
+import sys
+import threading
 import time
+from typing import Dict, Iterable
 
 
 # -------------------- INTERFACES ------------------------- #
@@ -29,6 +34,19 @@ class Storage(abc.ABC):
         """
         pass
 
+    def put_many(self, items: Dict[str, str]):
+        """Put many key-data pairs to storage.
+        Default: one put() per key, override for real batching.
+        """
+        for key, data in items.items():
+            self.put(key, data)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Get many keys from storage, as {key: data} dict.
+        Default: one get() per key, override for real batching.
+        """
+        return {key: self.get(key) for key in keys}
+
 
 # ------------------ IMPLEMENTATION ----------------------- #
 
@@ -48,30 +66,541 @@ class RemoteStorage(Storage):
         print(' - get "%s" key from remote storage.' % key)
         return self._storage.get(key)
 
+    def put_many(self, items: Dict[str, str]):
+        print(' - put %d keys to remote storage.' % len(items))
+        self._storage.update(items)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(keys)
+        print(' - get %d keys from remote storage.' % len(keys))
+        return {key: self._storage.get(key) for key in keys}
+
+
+# ------------------------- CACHE -------------------------- #
+
+class CacheEntry:
+    """Compact cache record: no per-key dict, just slots.
+    """
+    __slots__ = ('data', 'expires', 'size')
+
+    def __init__(self, data, expires: float, size: int):
+        self.data = data
+        self.expires = expires
+        self.size = size
+
+
+class LruPolicy:
+    """Least-recently-used eviction order. All operations are O(1).
+    """
+    def __init__(self):
+        self._order = collections.OrderedDict()
+
+    def add(self, key):
+        self._order[key] = None
+
+    def touch(self, key):
+        self._order.move_to_end(key)
+
+    def remove(self, key):
+        del self._order[key]
+
+    def victim(self):
+        return next(iter(self._order))
+
+
+class LfuPolicy:
+    """Least-frequently-used eviction order (LRU among equal frequencies).
+    Keys are kept in per-frequency buckets, so all operations are O(1).
+    """
+    def __init__(self):
+        self._freq = {}
+        self._buckets = collections.defaultdict(collections.OrderedDict)
+        self._min_freq = 0
+
+    def add(self, key):
+        self._freq[key] = 1
+        self._buckets[1][key] = None
+        self._min_freq = 1
+
+    def touch(self, key):
+        freq = self._freq[key]
+        self._unlink(key, freq)
+        if self._min_freq == freq and freq not in self._buckets:
+            self._min_freq = freq + 1
+        self._freq[key] = freq + 1
+        self._buckets[freq + 1][key] = None
+
+    def remove(self, key):
+        self._unlink(key, self._freq.pop(key))
+
+    def victim(self):
+        if self._min_freq not in self._buckets:
+            # Only after arbitrary removals: rare, so scan is fine here.
+            self._min_freq = min(self._buckets)
+        return next(iter(self._buckets[self._min_freq]))
+
+    def _unlink(self, key, freq):
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+
+
+class Cache:
+    """Bounded cache with per-entry TTL on a monotonic clock.
+    Limits: max entries count and (optionally) max total bytes.
+    Eviction order is chosen by policy: LRU or LFU.
+    """
+    MISSING = object()
+    POLICIES = {'lru': LruPolicy, 'lfu': LfuPolicy}
+
+    def __init__(self, ttl: float = 5, max_entries: int = 1024,
+                 max_bytes: int = None, policy: str = 'lru',
+                 sizeof=sys.getsizeof, clock=time.monotonic):
+        if policy not in self.POLICIES:
+            raise ValueError('Unknown cache policy "%s".' % policy)
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._policy = self.POLICIES[policy]()
+        self._sizeof = sizeof
+        self._clock = clock
+        self._entries = {}
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key):
+        """Get cached data by key, or Cache.MISSING if absent or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return self.MISSING
+        if entry.expires <= self._clock():
+            self.pop(key)
+            return self.MISSING
+        self._policy.touch(key)
+        return entry.data
+
+    def lookup(self, key, grace: float = 0):
+        """Get (data, fresh) pair. Expired data is still returned (as not
+        fresh) during "grace" seconds after expiration.
+        (Cache.MISSING, False) returned if key is absent or too old.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return self.MISSING, False
+        now = self._clock()
+        if entry.expires + grace <= now:
+            self.pop(key)
+            return self.MISSING, False
+        self._policy.touch(key)
+        return entry.data, entry.expires > now
+
+    def put(self, key, data, ttl: float = None):
+        """Put data to cache. Evicts entries to fit the limits.
+        Data bigger than max_bytes is not cached at all.
+        """
+        size = self._sizeof(data)
+        if self._max_bytes is not None and size > self._max_bytes:
+            self.pop(key)
+            return
+        expires = self._clock() + (self._ttl if ttl is None else ttl)
+        entry = self._entries.get(key)
+        if entry is not None:
+            # Rewrite in place: key keeps its usage history (LFU frequency).
+            self._bytes += size - entry.size
+            entry.data, entry.expires, entry.size = data, expires, size
+            self._policy.touch(key)
+            while (self._max_bytes is not None and
+                   self._bytes > self._max_bytes):
+                self.pop(self._policy.victim())
+            return
+        while self._entries and (
+                len(self._entries) >= self._max_entries or
+                (self._max_bytes is not None and
+                 self._bytes + size > self._max_bytes)):
+            self.pop(self._policy.victim())
+        self._entries[key] = CacheEntry(data, expires, size)
+        self._policy.add(key)
+        self._bytes += size
+
+    def pop(self, key):
+        """Remove key from cache, if it is there.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._policy.remove(key)
+            self._bytes -= entry.size
+
+    def clear(self):
+        for key in list(self._entries):
+            self.pop(key)
+
+
+# ---------------------- WRITE POLICIES ---------------------- #
+
+class WritePolicy(abc.ABC):
+    """Strategy of ProxyStorage.put(): how writes meet the cache.
+    """
+    def bind(self, proxy: 'ProxyStorage'):
+        """Called once, by proxy constructor.
+        """
+        self._proxy = proxy
+
+    @abc.abstractmethod
+    def put(self, key: str, data: str):
+        pass
+
+    @abc.abstractmethod
+    def put_many(self, items: Dict[str, str]):
+        pass
+
+    def pending(self, key: str):
+        """Data written, but not yet stored in target storage.
+        """
+        return Cache.MISSING
+
+    def close(self):
+        pass
+
+
+class WriteAround(WritePolicy):
+    """Write to target only, cache is untouched (may serve stale data).
+    """
+    def put(self, key: str, data: str):
+        return self._proxy._write_target(key, data)
+
+    def put_many(self, items: Dict[str, str]):
+        return self._proxy._write_target_many(items)
+
+
+class WriteThrough(WritePolicy):
+    """Write to target, then update cache.
+    """
+    def put(self, key: str, data: str):
+        result = self._proxy._write_target(key, data)
+        self._proxy._cache_put(key, data)
+        return result
+
+    def put_many(self, items: Dict[str, str]):
+        result = self._proxy._write_target_many(items)
+        for key, data in items.items():
+            self._proxy._cache_put(key, data)
+        return result
+
+
+class InvalidateOnWrite(WritePolicy):
+    """Write to target, then drop cached entry.
+    """
+    def put(self, key: str, data: str):
+        result = self._proxy._write_target(key, data)
+        self._proxy._cache_pop(key)
+        return result
+
+    def put_many(self, items: Dict[str, str]):
+        result = self._proxy._write_target_many(items)
+        for key in items:
+            self._proxy._cache_pop(key)
+        return result
+
+
+class WriteBehind(WritePolicy):
+    """Update cache at once, write to target later, in batches.
+    Background worker flushes when batch_size keys are queued or
+    every flush_interval seconds. Repeated puts of one key are merged.
+    close() (called at exit too) flushes everything left.
+    """
+    def __init__(self, batch_size: int = 100, flush_interval: float = 1.0):
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._queued = {}
+        self._flushing = {}
+        self._closed = False
+        self._worker = None
+
+    def bind(self, proxy: 'ProxyStorage'):
+        super().bind(proxy)
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def put(self, key: str, data: str):
+        self.put_many({key: data})
+
+    def put_many(self, items: Dict[str, str]):
+        # Under the lock: close() can't slip in between check and queue.
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('Write-behind policy is closed.')
+            for key, data in items.items():
+                self._proxy._cache_put(key, data)
+            self._queued.update(items)
+            if len(self._queued) >= self._batch_size:
+                self._wakeup.set()
+
+    def pending(self, key: str):
+        with self._lock:
+            if key in self._queued:
+                return self._queued[key]
+            return self._flushing.get(key, Cache.MISSING)
+
+    def flush(self):
+        """Write all queued data to target storage, in one batch.
+        On error the batch is queued back (newer puts win).
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._flushing, self._queued = self._queued, {}
+            try:
+                if self._flushing:
+                    self._proxy._write_target_many(self._flushing)
+            except Exception:
+                with self._lock:
+                    self._flushing.update(self._queued)
+                    self._queued = self._flushing
+                raise
+            finally:
+                with self._lock:
+                    self._flushing = {}
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join()
+        self.flush()
+        # Registered close() keeps policy and proxy alive till exit.
+        atexit.unregister(self.close)
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as error:
+                print(' - write-behind flush failed: %r' % error)
+
+
+# ------------------------- PROXY -------------------------- #
 
 class ProxyStorage(Storage):
-    """Logging decorator class, for Storage class.
-    Log to console when put() and get() methods are called.
+    """Caching proxy class, for Storage class.
+    Serves get() from bounded cache while the entry is fresh.
+    put() behaviour is set by write policy (WriteAround by default).
     """
     TIMEDELTA = 5
 
-    def __init__(self, target_storage: Storage):
+    def __init__(self, target_storage: Storage, cache: Cache = None,
+                 write_policy: WritePolicy = None):
         self._target_storage = target_storage
-        self._cache = {}
+        if cache is None:
+            cache = Cache(ttl=self.TIMEDELTA)
+        self._cache = cache
+        if write_policy is None:
+            write_policy = WriteAround()
+        self._write_policy = write_policy
+        write_policy.bind(self)
 
     def put(self, key: str, data: str):
-        return self._target_storage.put(key, data)
+        return self._write_policy.put(key, data)
 
     def get(self, key: str) -> str:
-        if (key in self._cache and
-                    time.time() - self._cache[key]['time'] < self.TIMEDELTA):
+        data = self._cache.get(key)
+        if data is not Cache.MISSING:
             print(' - get "%s" key from cache.' % key)
-            return self._cache[key]['data']
-        else:
+            return data
+        data = self._read_target(key)
+        self._cache.put(key, data)
+        print(' - cached "%s"' % key)
+        return data
+
+    def put_many(self, items: Dict[str, str]):
+        return self._write_policy.put_many(items)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Cache hits are served at once, all misses - by one target call.
+        """
+        result = {}
+        misses = []
+        for key in keys:
+            data = self._cache.get(key)
+            if data is Cache.MISSING:
+                misses.append(key)
+            else:
+                result[key] = data
+        if misses:
+            fetched = self._read_target_many(misses)
+            for key, data in fetched.items():
+                self._cache.put(key, data)
+            result.update(fetched)
+        print(' - got %d keys from cache, %d from target.' % (
+            len(result) - len(misses), len(misses)))
+        return result
+
+    def close(self):
+        """Release write policy (flushes postponed writes).
+        """
+        self._write_policy.close()
+
+    def _read_target(self, key: str) -> str:
+        data = self._write_policy.pending(key)
+        if data is Cache.MISSING:
             data = self._target_storage.get(key)
-            self._cache[key] = {'data': data, 'time': int(time.time())}
-            print(' - cached "%s"' % key)
+        return data
+
+    def _read_target_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        result = {}
+        misses = []
+        for key in keys:
+            data = self._write_policy.pending(key)
+            if data is Cache.MISSING:
+                misses.append(key)
+            else:
+                result[key] = data
+        if misses:
+            result.update(self._target_storage.get_many(misses))
+        return result
+
+    def _write_target(self, key: str, data: str):
+        return self._target_storage.put(key, data)
+
+    def _write_target_many(self, items: Dict[str, str]):
+        return self._target_storage.put_many(items)
+
+    def _cache_put(self, key: str, data: str):
+        self._cache.put(key, data)
+
+    def _cache_pop(self, key: str):
+        self._cache.pop(key)
+
+
+class _Flight:
+    """Single in-flight backend fetch, shared by all waiting threads.
+    """
+    __slots__ = ('done', 'data', 'error', 'outdated')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.data = None
+        self.error = None
+        self.outdated = False
+
+
+class CoalescingProxyStorage(ProxyStorage):
+    """Thread-safe caching proxy.
+    Concurrent misses of the same key share a single backend get().
+    If stale_ttl is set, expired data is served up to stale_ttl seconds
+    more, while one background thread refreshes it.
+    """
+    def __init__(self, target_storage: Storage, cache: Cache = None,
+                 write_policy: WritePolicy = None, stale_ttl: float = 0):
+        self._stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._flights = {}
+        super().__init__(target_storage, cache, write_policy)
+
+    def get(self, key: str) -> str:
+        with self._lock:
+            data, fresh = self._cache.lookup(key, self._stale_ttl)
+            if fresh:
+                print(' - get "%s" key from cache.' % key)
+                return data
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if data is not Cache.MISSING:
+            if leader:
+                threading.Thread(target=self._fetch, args=(key, flight),
+                                 daemon=True).start()
             return data
+        if leader:
+            self._fetch(key, flight)
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.data
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Fresh hits are served at once. Misses, not fetched yet by other
+        threads, are fetched by one target call. Stale data is not served.
+        """
+        result = {}
+        own = {}
+        foreign = {}
+        with self._lock:
+            for key in keys:
+                if key in result or key in own or key in foreign:
+                    continue
+                data, fresh = self._cache.lookup(key)
+                if fresh:
+                    result[key] = data
+                elif key in self._flights:
+                    foreign[key] = self._flights[key]
+                else:
+                    own[key] = self._flights[key] = _Flight()
+        if own:
+            self._fetch_many(own)
+        for key, flight in list(own.items()) + list(foreign.items()):
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            result[key] = flight.data
+        return result
+
+    def _fetch(self, key: str, flight: _Flight):
+        self._fetch_many({key: flight})
+
+    def _fetch_many(self, flights: Dict[str, _Flight]):
+        """Get data from target storage and publish it to waiters.
+        Data is not cached if the key was written meanwhile.
+        """
+        try:
+            fetched = self._read_target_many(flights)
+            with self._lock:
+                for key, flight in flights.items():
+                    flight.data = fetched.get(key)
+                    if not flight.outdated:
+                        self._cache.put(key, flight.data)
+            print(' - cached %s' % ', '.join('"%s"' % q for q in flights))
+        except Exception as error:
+            for flight in flights.values():
+                flight.error = error
+        finally:
+            with self._lock:
+                for key in flights:
+                    del self._flights[key]
+            for flight in flights.values():
+                flight.done.set()
+
+    def _cache_put(self, key: str, data: str):
+        with self._lock:
+            self._outdate_flight(key)
+            self._cache.put(key, data)
+
+    def _cache_pop(self, key: str):
+        with self._lock:
+            self._outdate_flight(key)
+            self._cache.pop(key)
+
+    def _outdate_flight(self, key: str):
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight.outdated = True
 
 
 # ------------------------- TEST --------------------------- #
@@ -84,3 +613,21 @@ if __name__ == '__main__':
     for _ in range(5):
         proxy.get('some_key')
 
+    print('\nBounded LFU cache test:')
+    proxy = ProxyStorage(storage, Cache(max_entries=2, policy='lfu'))
+    for key in ('a', 'a', 'b', 'c', 'a', 'b'):
+        proxy.put(key, key.upper())
+        proxy.get(key)
+
+    print('\nWrite-behind test:')
+    proxy = ProxyStorage(storage, write_policy=WriteBehind(batch_size=3))
+    for index in range(4):
+        proxy.put('some_key', 'value_%d' % index)
+        print('Got:', proxy.get('some_key'))
+    proxy.close()
+
+    print('\nBulk operations test:')
+    proxy = ProxyStorage(storage, write_policy=WriteThrough())
+    proxy.put_many({'k1': 'v1', 'k2': 'v2'})
+    print('Got:', proxy.get_many(['k1', 'k2', 'k3']))
+